@@ -1,8 +1,10 @@
 """Configuration settings for CrewInsight MVP."""
 
+import importlib.util
 import os
+from functools import lru_cache
 from typing import Optional
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -24,14 +26,39 @@ class Settings(BaseSettings):
     port: int = 8000
     debug: bool = True
     
+    # Default thread pool size for synchronous analysis work run off the event loop
+    worker_threads: int = 32
+    
+    # Background analysis workers and the number of queued analyses before /analyze returns 503
+    analysis_workers: int = os.cpu_count() or 4
+    analysis_queue_size: int = 100
+    
+    # Uvicorn event loop and HTTP parser (uvloop is not available on Windows)
+    event_loop: str = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http_parser: str = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    
+    # Keep full upstream payloads on MarketData (debugging only, large)
+    store_raw_data: bool = False
+    
+    # Redis for shared result storage across workers (in-memory storage when unset)
+    redis_url: Optional[str] = None
+    summary_cache_ttl: int = 3600
+    
     # Rate Limiting
     max_concurrent_requests: int = 10
     request_timeout: int = 30
+    max_retries: int = 3
+    alpha_vantage_requests_per_minute: int = 5
+    news_api_requests_per_minute: int = 10
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment only once."""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
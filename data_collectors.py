@@ -1,36 +1,251 @@
 """Data collectors for market data from various sources."""
 
 import asyncio
+import json
 import logging
+import random
+import re
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
 import httpx
-import pandas as pd
+import numpy as np
+import orjson
+from aiolimiter import AsyncLimiter
 
 from models import MarketData, MarketRegion, TimeFrame
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Representative stock symbol per market/sector
+_SYMBOL_MAP = MappingProxyType({
+    "technology": "AAPL",
+    "finance": "JPM",
+    "healthcare": "JNJ",
+    "energy": "XOM",
+    "consumer": "WMT"
+})
+_DEFAULT_SYMBOL = "SPY"  # S&P 500 ETF as default
+
+# Upstream responses worth retrying after a backoff
+RETRYABLE_STATUS_CODES = {429, 503}
+
+# Longest Retry-After (in seconds) worth waiting for; longer hints fail the request instead
+_MAX_RETRY_AFTER = 60.0
+
+# Upstream failures that fall back to mock data; anything else is a bug and propagates
+_UPSTREAM_ERRORS = (httpx.HTTPError, json.JSONDecodeError)
+
+# Upstream failures plus malformed payloads when parsing a single response
+_PAYLOAD_ERRORS = _UPSTREAM_ERRORS + (KeyError, ValueError)
+
+# Keyword tables for news analysis, built once at import time
+_SENTIMENT_POLARITY = MappingProxyType({
+    **{word: 1 for word in ("growth", "profit", "gain", "rise", "increase", "positive", "strong", "up", "bullish")},
+    **{word: -1 for word in ("decline", "loss", "fall", "drop", "decrease", "negative", "weak", "down", "bearish")}
+})
+
+_THEME_KEYWORDS = MappingProxyType({
+    "earnings": frozenset({"earnings", "revenue", "profit", "quarterly"}),
+    "regulation": frozenset({"regulation", "policy", "government", "compliance"}),
+    "innovation": frozenset({"innovation", "technology", "digital", "ai", "automation"}),
+    "competition": frozenset({"competition", "rival", "competitor"}),
+    "mergers": frozenset({"merger", "acquisition", "deal", "buyout"})
+})
+
+# Multi-word theme keywords that cannot be matched token by token
+_THEME_PHRASES = MappingProxyType({
+    "competition": ("market share",)
+})
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+# Static parts of the mock payloads used when an upstream API is unavailable;
+# callers merge in market-specific fields with the | operator
+_MOCK_OVERVIEW = MappingProxyType({
+    "MarketCapitalization": "1000000000",
+    "PERatio": "25.5"
+})
+
+_MOCK_PROCESSED_OVERVIEW = MappingProxyType({
+    "market_cap": "1B",
+    "pe_ratio": "25.5"
+})
+
+# Read-only at both levels; copied into plain dicts when building a payload
+_MOCK_TIME_SERIES = MappingProxyType({
+    "2024-01-01": MappingProxyType({"4. close": "150.00"}),
+    "2024-01-02": MappingProxyType({"4. close": "152.50"}),
+    "2024-01-03": MappingProxyType({"4. close": "151.25"})
+})
+
+_MOCK_PROCESSED_TIMESERIES = MappingProxyType({
+    "price_trend": "up",
+    "price_change_percent": 0.83,
+    "volatility": 1.2,
+    "data_points": 3
+})
+
+_MOCK_NEWS = MappingProxyType({
+    "status": "ok",
+    "totalResults": 15
+})
+
+_MOCK_PROCESSED_NEWS = MappingProxyType({
+    "article_count": 15,
+    "avg_sentiment": 0.3,
+    "sentiment_trend": "positive",
+    "top_themes": ("earnings", "innovation", "growth"),
+    "news_volume": 15
+})
+
+_ECONOMIC_INDICATORS = MappingProxyType({
+    "gdp_growth": 2.5,
+    "inflation_rate": 3.2,
+    "unemployment_rate": 4.1,
+    "interest_rate": 5.25,
+    "market_volatility": 18.5
+})
+
+_PROCESSED_ECONOMIC_INDICATORS = MappingProxyType({
+    "economic_health": "moderate",
+    "growth_trend": "stable",
+    "inflation_pressure": "moderate",
+    "market_conditions": "volatile",
+    "key_risks": ("inflation", "interest_rates")
+})
+
+_MOCK_ECONOMIC_INDICATORS = MappingProxyType({
+    "gdp_growth": 2.8,
+    "inflation_rate": 2.9,
+    "unemployment_rate": 3.8,
+    "interest_rate": 5.0,
+    "market_volatility": 15.2
+})
+
+_MOCK_PROCESSED_ECONOMIC_INDICATORS = MappingProxyType({
+    "economic_health": "good",
+    "growth_trend": "positive",
+    "inflation_pressure": "low",
+    "market_conditions": "stable",
+    "key_risks": ("geopolitical", "supply_chain")
+})
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit for upstream requests, in the style of TCP congestion control.
+    
+    Each successful request grows the limit by 1/limit (about one slot per full
+    window); an overload signal (429/503 or a transport error) halves it.
+    """
+    
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+    
+    async def acquire(self):
+        """Wait until a request slot is free under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+    
+    async def release(self, overloaded: bool = False):
+        """Release a slot and adjust the limit based on the request outcome."""
+        async with self._condition:
+            self._in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit / 2)
+                logger.warning(f"Upstream overload detected, concurrency limit reduced to {int(self.limit)}")
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
 
 class BaseDataCollector:
     """Base class for data collectors."""
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, requests_per_minute: Optional[int] = None):
         self.name = name
         self.timeout = settings.request_timeout
+        self.max_retries = settings.max_retries
+        self.rate_limiter = AsyncLimiter(requests_per_minute, 60) if requests_per_minute else None
+        self.concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None
     
-    async def collect_data(self, market: str, region: MarketRegion, timeframe: TimeFrame) -> List[MarketData]:
-        """Collect market data. Must be implemented by subclasses."""
+    async def collect_data(self, market: str, region: MarketRegion, timeframe: TimeFrame, client: httpx.AsyncClient) -> List[MarketData]:
+        """Collect market data using the shared HTTP client. Must be implemented by subclasses."""
         raise NotImplementedError
     
-    def _create_market_data(self, raw_data: Dict[str, Any], processed_data: Dict[str, Any]) -> MarketData:
-        """Create MarketData object."""
+    async def _get_with_retry(self, client: httpx.AsyncClient, url: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET a URL under the collector's rate limit, retrying 429/503 with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            
+            response = await self._send(client, url, params)
+            
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                delay = self._get_retry_delay(response, attempt)
+                if delay is not None:
+                    logger.warning(
+                        f"{self.name} returned {response.status_code}, retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1}/{self.max_retries})"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                logger.warning(
+                    f"{self.name} returned {response.status_code} with Retry-After over "
+                    f"{_MAX_RETRY_AFTER:.0f}s, not retrying"
+                )
+            
+            response.raise_for_status()
+            return response
+    
+    async def _send(self, client: httpx.AsyncClient, url: str, params: Dict[str, Any]) -> httpx.Response:
+        """Send one GET, reporting its outcome to the shared concurrency limiter if set."""
+        if not self.concurrency_limiter:
+            return await client.get(url, params=params)
+        
+        await self.concurrency_limiter.acquire()
+        overloaded = False
+        try:
+            response = await client.get(url, params=params)
+            overloaded = response.status_code in RETRYABLE_STATUS_CODES
+            return response
+        except httpx.TransportError:
+            overloaded = True
+            raise
+        finally:
+            await self.concurrency_limiter.release(overloaded)
+    
+    def _get_retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Honor Retry-After in seconds (None if over _MAX_RETRY_AFTER), otherwise back off exponentially with jitter."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+            return delay if delay <= _MAX_RETRY_AFTER else None
+        return min((2 ** attempt) + random.uniform(0, 1), _MAX_RETRY_AFTER)
+    
+    def _create_market_data(
+        self,
+        raw_data: Dict[str, Any],
+        processed_data: Dict[str, Any],
+        store_raw: Optional[bool] = None,
+        timestamp: Optional[datetime] = None
+    ) -> MarketData:
+        """Create MarketData object, keeping the upstream payload only when store_raw is enabled."""
+        if store_raw is None:
+            store_raw = settings.store_raw_data
+        
         return MarketData(
             source=self.name,
             data_type="market_data",
-            timestamp=datetime.now(),
-            raw_data=raw_data,
+            timestamp=timestamp or datetime.now(),
+            raw_data=raw_data if store_raw else None,
             processed_data=processed_data
         )
 
@@ -39,48 +254,49 @@ class AlphaVantageCollector(BaseDataCollector):
     """Collector for Alpha Vantage financial data."""
     
     def __init__(self):
-        super().__init__("Alpha Vantage")
+        super().__init__("Alpha Vantage", requests_per_minute=settings.alpha_vantage_requests_per_minute)
         self.api_key = settings.alpha_vantage_api_key
         self.base_url = "https://www.alphavantage.co/query"
     
-    async def collect_data(self, market: str, region: MarketRegion, timeframe: TimeFrame) -> List[MarketData]:
+    async def collect_data(self, market: str, region: MarketRegion, timeframe: TimeFrame, client: httpx.AsyncClient) -> List[MarketData]:
         """Collect data from Alpha Vantage."""
         if not self.api_key:
             logger.warning("Alpha Vantage API key not provided, using mock data")
             return self._get_mock_data(market, region, timeframe)
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # Get market overview data
-                overview_data = await self._get_market_overview(client, market)
-                
-                # Get time series data
-                timeseries_data = await self._get_timeseries_data(client, market, timeframe)
-                
-                results = []
-                if overview_data:
-                    results.append(overview_data)
-                if timeseries_data:
-                    results.append(timeseries_data)
-                
-                return results
-                
-        except Exception as e:
+            symbol = self._get_symbol_for_market(market)
+            timestamp = datetime.now()
+            
+            # Fetch overview and time series concurrently over the shared connection
+            overview_data, timeseries_data = await asyncio.gather(
+                self._get_market_overview(client, symbol, timestamp),
+                self._get_timeseries_data(client, symbol, timeframe, timestamp)
+            )
+            
+            results = []
+            if overview_data:
+                results.append(overview_data)
+            if timeseries_data:
+                results.append(timeseries_data)
+            
+            return results
+            
+        except _UPSTREAM_ERRORS as e:
             logger.error(f"Error collecting Alpha Vantage data: {e}")
             return self._get_mock_data(market, region, timeframe)
     
-    async def _get_market_overview(self, client: httpx.AsyncClient, market: str) -> Optional[MarketData]:
+    async def _get_market_overview(self, client: httpx.AsyncClient, symbol: str, timestamp: datetime) -> Optional[MarketData]:
         """Get market overview data."""
         try:
             params = {
                 "function": "OVERVIEW",
-                "symbol": self._get_symbol_for_market(market),
+                "symbol": symbol,
                 "apikey": self.api_key
             }
             
-            response = await client.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await self._get_with_retry(client, self.base_url, params)
+            data = orjson.loads(response.content)
             
             if "Error Message" in data:
                 logger.warning(f"Alpha Vantage error: {data['Error Message']}")
@@ -90,17 +306,16 @@ class AlphaVantageCollector(BaseDataCollector):
                 "market_cap": data.get("MarketCapitalization"),
                 "pe_ratio": data.get("PERatio"),
                 "sector": data.get("Sector"),
-                "industry": data.get("Industry"),
-                "description": data.get("Description", "")[:500]  # Truncate for storage
+                "industry": data.get("Industry")
             }
             
-            return self._create_market_data(data, processed_data)
+            return self._create_market_data(data, processed_data, timestamp=timestamp)
             
-        except Exception as e:
+        except _PAYLOAD_ERRORS as e:
             logger.error(f"Error getting market overview: {e}")
             return None
     
-    async def _get_timeseries_data(self, client: httpx.AsyncClient, market: str, timeframe: TimeFrame) -> Optional[MarketData]:
+    async def _get_timeseries_data(self, client: httpx.AsyncClient, symbol: str, timeframe: TimeFrame, timestamp: datetime) -> Optional[MarketData]:
         """Get time series data."""
         try:
             function_map = {
@@ -113,96 +328,112 @@ class AlphaVantageCollector(BaseDataCollector):
             
             params = {
                 "function": function,
-                "symbol": self._get_symbol_for_market(market),
+                "symbol": symbol,
                 "apikey": self.api_key,
                 "outputsize": "compact"
             }
             
-            response = await client.get(self.base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            response = await self._get_with_retry(client, self.base_url, params)
+            data = orjson.loads(response.content)
             
             if "Error Message" in data:
                 logger.warning(f"Alpha Vantage timeseries error: {data['Error Message']}")
                 return None
             
             # Process time series data
-            time_series_key = list(data.keys())[1]  # Skip metadata key
+            time_series_key = next((key for key in data if key.startswith("Time Series")), None)
+            if time_series_key is None:
+                logger.warning(f"Alpha Vantage timeseries response missing data: {data.get('Note') or data.get('Information')}")
+                return None
             time_series = data[time_series_key]
             
             # Calculate basic statistics
             prices = [float(day_data["4. close"]) for day_data in time_series.values()]
-            processed_data = {
-                "price_trend": "up" if prices[0] > prices[-1] else "down",
-                "price_change_percent": ((prices[0] - prices[-1]) / prices[-1]) * 100,
-                "volatility": self._calculate_volatility(prices),
-                "data_points": len(prices)
-            }
+            processed_data = self.bulk_process_timeseries({symbol: prices}).get(symbol)
+            if processed_data is None:
+                logger.warning(f"Alpha Vantage timeseries for {symbol} has no price data")
+                return None
             
-            return self._create_market_data(data, processed_data)
+            return self._create_market_data(data, processed_data, timestamp=timestamp)
             
-        except Exception as e:
+        except _PAYLOAD_ERRORS as e:
             logger.error(f"Error getting timeseries data: {e}")
             return None
     
     def _get_symbol_for_market(self, market: str) -> str:
         """Get stock symbol for market/sector."""
-        symbol_map = {
-            "technology": "AAPL",
-            "finance": "JPM",
-            "healthcare": "JNJ",
-            "energy": "XOM",
-            "consumer": "WMT",
-            "default": "SPY"  # S&P 500 ETF as default
-        }
-        return symbol_map.get(market.lower(), symbol_map["default"])
+        return _SYMBOL_MAP.get(market.lower(), _DEFAULT_SYMBOL)
     
-    def _calculate_volatility(self, prices: List[float]) -> float:
-        """Calculate price volatility."""
-        if len(prices) < 2:
-            return 0.0
+    def bulk_process_timeseries(self, series_dict: Dict[str, List[float]]) -> Dict[str, Dict[str, Any]]:
+        """Calculate price trend statistics for many series at once.
+        
+        Prices are ordered newest first, as returned by Alpha Vantage. Series of
+        different lengths are padded with NaN so every statistic is computed in a
+        single vectorized pass over a (n_series, n_points) array.
+        """
+        series_dict = {key: prices for key, prices in series_dict.items() if prices}
+        if not series_dict:
+            return {}
+        
+        keys = list(series_dict)
+        lengths = np.array([len(series_dict[key]) for key in keys])
+        arr = np.full((len(keys), lengths.max()), np.nan)
+        for row, key in enumerate(keys):
+            arr[row, :lengths[row]] = series_dict[key]
         
-        returns = [(prices[i] - prices[i-1]) / prices[i-1] for i in range(1, len(prices))]
-        return float(pd.Series(returns).std()) * 100  # Convert to percentage
+        first = arr[:, 0]
+        last = arr[np.arange(len(keys)), lengths - 1]
+        # A zero oldest close has no defined percent change, so report no change
+        change_percent = np.divide((first - last) * 100, last, out=np.zeros(len(keys)), where=last != 0)
+        
+        # Sample std of period returns; series with fewer than two returns have no volatility
+        volatility = np.zeros(len(keys))
+        has_returns = lengths > 2
+        if has_returns.any():
+            subset = arr[has_returns]
+            base = subset[:, :-1]
+            # Returns off a zero close are undefined; leave them NaN so nanstd skips them
+            returns = np.divide(np.diff(subset, axis=1), base, out=np.full(base.shape, np.nan), where=base != 0)
+            enough = np.count_nonzero(~np.isnan(returns), axis=1) > 1
+            rows = np.flatnonzero(has_returns)[enough]
+            volatility[rows] = np.nanstd(returns[enough], axis=1, ddof=1) * 100  # Convert to percentage
+        
+        return {
+            key: {
+                "price_trend": "up" if first[row] > last[row] else "down",
+                "price_change_percent": float(change_percent[row]),
+                "volatility": float(volatility[row]),
+                "data_points": int(lengths[row])
+            }
+            for row, key in enumerate(keys)
+        }
     
     def _get_mock_data(self, market: str, region: MarketRegion, timeframe: TimeFrame) -> List[MarketData]:
         """Generate mock data when API is unavailable."""
-        mock_overview = {
-            "Symbol": self._get_symbol_for_market(market),
-            "Name": f"{market.title()} Sector",
-            "Sector": market.title(),
-            "MarketCapitalization": "1000000000",
-            "PERatio": "25.5",
+        symbol = self._get_symbol_for_market(market)
+        timestamp = datetime.now()
+        sector = market.title()
+        
+        mock_overview = _MOCK_OVERVIEW | {
+            "Symbol": symbol,
+            "Name": f"{sector} Sector",
+            "Sector": sector,
             "Description": f"Mock data for {market} sector analysis"
         }
-        
-        processed_overview = {
-            "market_cap": "1B",
-            "pe_ratio": "25.5",
-            "sector": market.title(),
-            "industry": f"{market.title()} Industry",
-            "description": f"Mock data for {market} sector analysis"
+        processed_overview = _MOCK_PROCESSED_OVERVIEW | {
+            "sector": sector,
+            "industry": f"{sector} Industry"
         }
         
         mock_timeseries = {
-            "Meta Data": {"Symbol": self._get_symbol_for_market(market)},
-            "Time Series": {
-                "2024-01-01": {"4. close": "150.00"},
-                "2024-01-02": {"4. close": "152.50"},
-                "2024-01-03": {"4. close": "151.25"}
-            }
-        }
-        
-        processed_timeseries = {
-            "price_trend": "up",
-            "price_change_percent": 0.83,
-            "volatility": 1.2,
-            "data_points": 3
+            "Meta Data": {"Symbol": symbol},
+            "Time Series": {date: dict(values) for date, values in _MOCK_TIME_SERIES.items()}
         }
+        processed_timeseries = dict(_MOCK_PROCESSED_TIMESERIES)
         
         return [
-            self._create_market_data(mock_overview, processed_overview),
-            self._create_market_data(mock_timeseries, processed_timeseries)
+            self._create_market_data(mock_overview, processed_overview, timestamp=timestamp),
+            self._create_market_data(mock_timeseries, processed_timeseries, timestamp=timestamp)
         ]
 
 
@@ -210,43 +441,41 @@ class NewsCollector(BaseDataCollector):
     """Collector for financial news data."""
     
     def __init__(self):
-        super().__init__("Financial News")
+        super().__init__("Financial News", requests_per_minute=settings.news_api_requests_per_minute)
         self.api_key = settings.news_api_key
         self.base_url = "https://newsapi.org/v2/everything"
     
-    async def collect_data(self, market: str, region: MarketRegion, timeframe: TimeFrame) -> List[MarketData]:
+    async def collect_data(self, market: str, region: MarketRegion, timeframe: TimeFrame, client: httpx.AsyncClient) -> List[MarketData]:
         """Collect financial news data."""
         if not self.api_key:
             logger.warning("News API key not provided, using mock data")
             return self._get_mock_news_data(market, region, timeframe)
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # Calculate date range based on timeframe
-                end_date = datetime.now()
-                start_date = self._get_start_date(end_date, timeframe)
-                
-                params = {
-                    "q": f"{market} market",
-                    "from": start_date.strftime("%Y-%m-%d"),
-                    "to": end_date.strftime("%Y-%m-%d"),
-                    "sortBy": "publishedAt",
-                    "language": "en",
-                    "pageSize": 20,
-                    "apiKey": self.api_key
-                }
-                
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get("status") != "ok":
-                    logger.warning(f"News API error: {data.get('message', 'Unknown error')}")
-                    return self._get_mock_news_data(market, region, timeframe)
-                
-                return self._process_news_data(data, market)
-                
-        except Exception as e:
+            # Calculate date range based on timeframe
+            end_date = datetime.now()
+            start_date = self._get_start_date(end_date, timeframe)
+            
+            params = {
+                "q": f"{market} market",
+                "from": start_date.strftime("%Y-%m-%d"),
+                "to": end_date.strftime("%Y-%m-%d"),
+                "sortBy": "publishedAt",
+                "language": "en",
+                "pageSize": 20,
+                "apiKey": self.api_key
+            }
+            
+            response = await self._get_with_retry(client, self.base_url, params)
+            data = orjson.loads(response.content)
+            
+            if data.get("status") != "ok":
+                logger.warning(f"News API error: {data.get('message', 'Unknown error')}")
+                return self._get_mock_news_data(market, region, timeframe)
+            
+            return self._process_news_data(data, market, timestamp=end_date)
+            
+        except _UPSTREAM_ERRORS as e:
             logger.error(f"Error collecting news data: {e}")
             return self._get_mock_news_data(market, region, timeframe)
     
@@ -262,7 +491,7 @@ class NewsCollector(BaseDataCollector):
         days = timeframe_days.get(timeframe, 7)
         return end_date - timedelta(days=days)
     
-    def _process_news_data(self, data: Dict[str, Any], market: str) -> List[MarketData]:
+    def _process_news_data(self, data: Dict[str, Any], market: str, timestamp: Optional[datetime] = None) -> List[MarketData]:
         """Process news data and extract sentiment/trends."""
         articles = data.get("articles", [])
         
@@ -271,25 +500,19 @@ class NewsCollector(BaseDataCollector):
         key_themes = []
         
         for article in articles:
-            title = article.get("title", "")
-            description = article.get("description", "")
+            title = article.get("title") or ""
+            description = article.get("description") or ""
             
-            # Simple sentiment analysis (positive/negative keywords)
-            sentiment = self._analyze_sentiment(title + " " + description)
+            # Simple sentiment analysis and theme extraction (keyword matching)
+            sentiment, themes = self._analyze_article(title + " " + description)
             sentiment_scores.append(sentiment)
-            
-            # Extract key themes
-            themes = self._extract_themes(title + " " + description)
             key_themes.extend(themes)
         
         # Calculate overall sentiment
         avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
         
         # Get most common themes
-        theme_counts = {}
-        for theme in key_themes:
-            theme_counts[theme] = theme_counts.get(theme, 0) + 1
-        top_themes = sorted(theme_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_themes = Counter(key_themes).most_common(5)
         
         processed_data = {
             "article_count": len(articles),
@@ -299,70 +522,60 @@ class NewsCollector(BaseDataCollector):
             "news_volume": len(articles)
         }
         
-        return [self._create_market_data(data, processed_data)]
+        return [self._create_market_data(data, processed_data, timestamp=timestamp)]
     
-    def _analyze_sentiment(self, text: str) -> float:
-        """Simple sentiment analysis using keyword matching."""
-        positive_words = ["growth", "profit", "gain", "rise", "increase", "positive", "strong", "up", "bullish"]
-        negative_words = ["decline", "loss", "fall", "drop", "decrease", "negative", "weak", "down", "bearish"]
-        
+    def _analyze_article(self, text: str) -> Tuple[float, List[str]]:
+        """Score sentiment and extract key themes from one tokenization of the text."""
         text_lower = text.lower()
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        tokens = _TOKEN_RE.findall(text_lower)
         
-        total_words = len(text.split())
-        if total_words == 0:
-            return 0.0
+        # Accept simple plurals by also considering each token without a trailing 's' or 'es'
+        token_set = set(tokens)
+        token_set.update([stem for token in token_set for stem in _plural_stems(token)])
         
-        return (positive_count - negative_count) / total_words
-    
-    def _extract_themes(self, text: str) -> List[str]:
-        """Extract key themes from text."""
-        themes = []
-        text_lower = text.lower()
+        score = 0
+        for token in tokens:
+            polarity = _SENTIMENT_POLARITY.get(token)
+            if polarity is None:
+                for stem in _plural_stems(token):
+                    polarity = _SENTIMENT_POLARITY.get(stem)
+                    if polarity is not None:
+                        break
+            if polarity:
+                score += polarity
         
-        theme_keywords = {
-            "earnings": ["earnings", "revenue", "profit", "quarterly"],
-            "regulation": ["regulation", "policy", "government", "compliance"],
-            "innovation": ["innovation", "technology", "digital", "ai", "automation"],
-            "competition": ["competition", "market share", "rival", "competitor"],
-            "mergers": ["merger", "acquisition", "deal", "buyout"]
-        }
+        themes = [
+            theme for theme, keywords in _THEME_KEYWORDS.items()
+            if token_set & keywords
+            or any(phrase in text_lower for phrase in _THEME_PHRASES.get(theme, ()))
+        ]
         
-        for theme, keywords in theme_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                themes.append(theme)
+        total_words = len(text.split())
+        if total_words == 0:
+            return 0.0, themes
         
-        return themes
+        return score / total_words, themes
     
     def _get_mock_news_data(self, market: str, region: MarketRegion, timeframe: TimeFrame) -> List[MarketData]:
         """Generate mock news data."""
-        mock_data = {
-            "status": "ok",
-            "totalResults": 15,
+        now = datetime.now()
+        mock_data = _MOCK_NEWS | {
             "articles": [
                 {
                     "title": f"{market.title()} sector shows strong growth",
                     "description": f"Recent developments in {market} indicate positive trends",
-                    "publishedAt": datetime.now().isoformat()
+                    "publishedAt": now.isoformat()
                 },
                 {
                     "title": f"Market analysis: {market} outlook remains optimistic",
                     "description": f"Experts predict continued growth in {market} sector",
-                    "publishedAt": (datetime.now() - timedelta(days=1)).isoformat()
+                    "publishedAt": (now - timedelta(days=1)).isoformat()
                 }
             ]
         }
+        processed_data = dict(_MOCK_PROCESSED_NEWS)
         
-        processed_data = {
-            "article_count": 15,
-            "avg_sentiment": 0.3,
-            "sentiment_trend": "positive",
-            "top_themes": ["earnings", "innovation", "growth"],
-            "news_volume": 15
-        }
-        
-        return [self._create_market_data(mock_data, processed_data)]
+        return [self._create_market_data(mock_data, processed_data, timestamp=now)]
 
 
 class EconomicDataCollector(BaseDataCollector):
@@ -371,7 +584,7 @@ class EconomicDataCollector(BaseDataCollector):
     def __init__(self):
         super().__init__("Economic Indicators")
     
-    async def collect_data(self, market: str, region: MarketRegion, timeframe: TimeFrame) -> List[MarketData]:
+    async def collect_data(self, market: str, region: MarketRegion, timeframe: TimeFrame, client: httpx.AsyncClient) -> List[MarketData]:
         """Collect economic indicator data."""
         try:
             # Simulate economic data collection
@@ -387,41 +600,15 @@ class EconomicDataCollector(BaseDataCollector):
         # In a real implementation, this would fetch from economic data APIs
         # like FRED (Federal Reserve Economic Data), World Bank, etc.
         
-        raw_data = {
-            "gdp_growth": 2.5,
-            "inflation_rate": 3.2,
-            "unemployment_rate": 4.1,
-            "interest_rate": 5.25,
-            "market_volatility": 18.5
-        }
-        
-        processed_data = {
-            "economic_health": "moderate",
-            "growth_trend": "stable",
-            "inflation_pressure": "moderate",
-            "market_conditions": "volatile",
-            "key_risks": ["inflation", "interest_rates"]
-        }
+        raw_data = dict(_ECONOMIC_INDICATORS)
+        processed_data = dict(_PROCESSED_ECONOMIC_INDICATORS)
         
         return self._create_market_data(raw_data, processed_data)
     
     def _get_mock_economic_data(self, market: str, region: MarketRegion, timeframe: TimeFrame) -> List[MarketData]:
         """Generate mock economic data."""
-        raw_data = {
-            "gdp_growth": 2.8,
-            "inflation_rate": 2.9,
-            "unemployment_rate": 3.8,
-            "interest_rate": 5.0,
-            "market_volatility": 15.2
-        }
-        
-        processed_data = {
-            "economic_health": "good",
-            "growth_trend": "positive",
-            "inflation_pressure": "low",
-            "market_conditions": "stable",
-            "key_risks": ["geopolitical", "supply_chain"]
-        }
+        raw_data = dict(_MOCK_ECONOMIC_INDICATORS)
+        processed_data = dict(_MOCK_PROCESSED_ECONOMIC_INDICATORS)
         
         return [self._create_market_data(raw_data, processed_data)]
 
@@ -435,25 +622,101 @@ class DataCollectorManager:
             NewsCollector(),
             EconomicDataCollector()
         ]
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(settings.max_concurrent_requests)
+        self._inflight: Dict[Tuple[str, str, MarketRegion, TimeFrame], asyncio.Task] = {}
+        
+        # Collector failures by (collector name, exception type)
+        self.error_counts: Counter = Counter()
+        
+        # Upstream HTTP concurrency adapts to overload signals, capped by the static limit
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(max_limit=settings.max_concurrent_requests)
+        for collector in self.collectors:
+            collector.concurrency_limiter = self.concurrency_limiter
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=settings.max_concurrent_requests,
+                max_keepalive_connections=settings.max_concurrent_requests
+            )
+            self._client = httpx.AsyncClient(
+                timeout=settings.request_timeout,
+                limits=limits,
+                http2=True
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _run_collector(
+        self,
+        collector: BaseDataCollector,
+        market: str,
+        region: MarketRegion,
+        timeframe: TimeFrame,
+        client: httpx.AsyncClient
+    ) -> List[MarketData]:
+        """Run a collector while holding a concurrency slot."""
+        async with self._semaphore:
+            return await collector.collect_data(market, region, timeframe, client=client)
+    
+    async def _collect_deduplicated(
+        self,
+        collector: BaseDataCollector,
+        market: str,
+        region: MarketRegion,
+        timeframe: TimeFrame,
+        client: httpx.AsyncClient
+    ) -> List[MarketData]:
+        """Share one in-flight collector call between identical concurrent requests."""
+        key = (collector.name, market, region, timeframe)
+        task = self._inflight.get(key)
+        
+        if task is None:
+            task = asyncio.create_task(self._run_collector(collector, market, region, timeframe, client))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight {collector.name} request for {market}")
+        
+        # Shield so a cancelled caller does not cancel the call for other waiters
+        return await asyncio.shield(task)
     
     async def collect_all_data(self, market: str, region: MarketRegion, timeframe: TimeFrame) -> List[MarketData]:
         """Collect data from all available sources."""
+        client = self._get_client()
         tasks = []
         
         for collector in self.collectors:
-            task = collector.collect_data(market, region, timeframe)
+            task = self._collect_deduplicated(collector, market, region, timeframe, client)
             tasks.append(task)
         
-        # Run all collectors concurrently
+        # Run all collectors concurrently, bounded by max_concurrent_requests
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Flatten results and filter out exceptions
+        # Flatten results and record exceptions
         all_data = []
-        for result in results:
+        for collector, result in zip(self.collectors, results):
             if isinstance(result, Exception):
-                logger.error(f"Data collector error: {result}")
+                self.error_counts[(collector.name, type(result).__name__)] += 1
+                logger.error(f"Data collector error in {collector.name}: {result}", exc_info=result)
             elif isinstance(result, list):
                 all_data.extend(result)
         
         logger.info(f"Collected {len(all_data)} data points from {len(self.collectors)} sources")
         return all_data
+
+
+def _plural_stems(token: str) -> Tuple[str, ...]:
+    """Candidate singulars of a plural token: without 's' ("gains"), then without 'es' ("losses")."""
+    if token.endswith("es"):
+        return (token[:-1], token[:-2])
+    if token.endswith("s"):
+        return (token[:-1],)
+    return ()
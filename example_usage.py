@@ -12,7 +12,7 @@ async def analyze_market_example():
     base_url = "http://localhost:8000"
     api_key = "crewinsight-mvp-2024"
     
-    async with httpx.AsyncClient(timeout=60.0) as client:
+    async with httpx.AsyncClient(timeout=60.0, headers={"X-API-Key": api_key}) as client:
         
         print("🔍 CrewInsight MVP - Market Analysis Example")
         print("=" * 50)
@@ -24,8 +24,7 @@ async def analyze_market_example():
         analysis_request = {
             "market": "technology",
             "region": "US",
-            "timeframe": "1m",
-            "api_key": api_key
+            "timeframe": "1m"
         }
         
         try:
@@ -37,49 +36,42 @@ async def analyze_market_example():
                 analysis_id = data["analysis_id"]
                 print(f"✅ Analysis started: {analysis_id}")
                 
-                # Wait for completion
+                # Wait for completion with a single long-poll request
                 print("⏳ Waiting for analysis to complete...")
-                for i in range(60):  # Wait up to 60 seconds
-                    await asyncio.sleep(1)
-                    
-                    result_response = await client.get(
-                        f"{base_url}/results/{analysis_id}",
-                        params={"api_key": api_key}
-                    )
+                result_response = await client.get(
+                    f"{base_url}/results/{analysis_id}/wait",
+                    params={"timeout": 60},
+                    timeout=90.0
+                )
+                
+                if result_response.status_code == 200:
+                    result_data = result_response.json()
+                    status = result_data["status"]
                     
-                    if result_response.status_code == 200:
-                        result_data = result_response.json()
-                        status = result_data["status"]
+                    if status == "completed":
+                        print("✅ Analysis completed!")
+                        print(f"📈 Trends identified: {len(result_data['trends'])}")
+                        print(f"📝 Summary length: {len(result_data['summary'])} characters")
+                        print(f"⏱️  Processing time: {result_data['processing_time']:.2f} seconds")
                         
-                        if status == "completed":
-                            print("✅ Analysis completed!")
-                            print(f"📈 Trends identified: {len(result_data['trends'])}")
-                            print(f"📝 Summary length: {len(result_data['summary'])} characters")
-                            print(f"⏱️  Processing time: {result_data['processing_time']:.2f} seconds")
-                            
-                            # Display trends
-                            print("\n🎯 Key Trends:")
-                            for i, trend in enumerate(result_data['trends'], 1):
-                                impact_emoji = {"positive": "📈", "negative": "📉", "neutral": "➡️"}.get(trend['impact'], "➡️")
-                                print(f"   {i}. {impact_emoji} {trend['trend_name']}")
-                                print(f"      Confidence: {trend['confidence']:.1%}")
-                                print(f"      {trend['description']}")
-                            
-                            # Display summary
-                            print(f"\n📋 Summary:")
-                            print(f"   {result_data['summary'][:200]}...")
-                            break
-                            
-                        elif status == "failed":
-                            print(f"❌ Analysis failed: {result_data.get('error_message')}")
-                            break
-                        else:
-                            print(f"   Status: {status} (waiting...)")
+                        # Display trends
+                        print("\n🎯 Key Trends:")
+                        for i, trend in enumerate(result_data['trends'], 1):
+                            impact_emoji = {"positive": "📈", "negative": "📉", "neutral": "➡️"}.get(trend['impact'], "➡️")
+                            print(f"   {i}. {impact_emoji} {trend['trend_name']}")
+                            print(f"      Confidence: {trend['confidence']:.1%}")
+                            print(f"      {trend['description']}")
+                        
+                        # Display summary
+                        print(f"\n📋 Summary:")
+                        print(f"   {result_data['summary'][:200]}...")
+                    
+                    elif status == "failed":
+                        print(f"❌ Analysis failed: {result_data.get('error_message')}")
                     else:
-                        print(f"   Error checking status: {result_response.status_code}")
-                
+                        print("⏰ Analysis timed out")
                 else:
-                    print("⏰ Analysis timed out")
+                    print(f"   Error checking status: {result_response.status_code}")
             
             else:
                 print(f"❌ Failed to start analysis: {response.status_code}")
@@ -95,8 +87,7 @@ async def analyze_market_example():
         finance_request = {
             "market": "finance",
             "region": "US",
-            "timeframe": "1w",
-            "api_key": api_key
+            "timeframe": "1w"
         }
         
         try:
@@ -109,10 +100,7 @@ async def analyze_market_example():
                 
                 # Quick check (don't wait for completion in example)
                 await asyncio.sleep(2)
-                result_response = await client.get(
-                    f"{base_url}/results/{analysis_id}",
-                    params={"api_key": api_key}
-                )
+                result_response = await client.get(f"{base_url}/results/{analysis_id}")
                 
                 if result_response.status_code == 200:
                     result_data = result_response.json()
@@ -133,7 +121,7 @@ async def analyze_market_example():
         try:
             response = await client.get(
                 f"{base_url}/results",
-                params={"api_key": api_key, "limit": 5}
+                params={"limit": 5}
             )
             
             if response.status_code == 200:
@@ -1,15 +1,21 @@
 """Main FastAPI application for CrewInsight MVP."""
 
 import asyncio
+import hmac
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Optional
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Query, Response, Security
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.security import APIKeyHeader
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+import orjson
 import uvicorn
 
 from models import AnalysisRequest, AnalysisResult, ErrorResponse, MarketRegion, TimeFrame
@@ -26,13 +32,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the thread pool and analysis workers on startup, and stop them and release shared resources on shutdown."""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=settings.worker_threads))
+    logger.info(f"Running on event loop {type(loop).__module__}")
+    
+    workers = [asyncio.create_task(analysis_worker()) for _ in range(settings.analysis_workers)]
+    yield
+    
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    await data_collector_manager.aclose()
+    await storage.aclose()
+    await summarizer.aclose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="CrewInsight MVP",
     description="Business Analyst Agent for Market Data Analysis",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -44,9 +71,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (full /results payloads) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# Longest time a /results/{id}/wait request may hold the connection open
+MAX_WAIT_SECONDS = 120.0
+
+# Cached OpenAI probe for /health: reused for HEALTH_CACHE_TTL seconds, and a failed
+# probe still reports connected if the last successful one is under HEALTH_STALE_TTL old
+HEALTH_CACHE_TTL = 10.0
+HEALTH_STALE_TTL = 60.0
+_health_cache: Dict[str, Any] = {"checked_at": 0.0, "openai_status": None, "connected_at": None}
+
+# Expected API key, encoded once for constant-time comparison
+_API_KEY_BYTES = settings.api_key.encode()
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+# Pending analyses as (analysis_id, market, region, timeframe), consumed by analysis_worker tasks
+analysis_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.analysis_queue_size)
+
 # Initialize services
 data_collector_manager = DataCollectorManager()
 trend_analyzer = TrendAnalyzer()
@@ -54,18 +100,18 @@ summarizer = MarketSummarizer()
 
 
 def verify_api_key(api_key: str) -> bool:
-    """Verify API key for authentication."""
-    return api_key == settings.api_key
+    """Verify API key for authentication in constant time."""
+    return hmac.compare_digest(api_key.encode(), _API_KEY_BYTES)
 
 
-async def authenticate_request(api_key: str) -> bool:
-    """Authenticate API request."""
-    if not verify_api_key(api_key):
+async def require_api_key(api_key: Optional[str] = Security(api_key_header)) -> str:
+    """Authenticate API request from the X-API-Key header."""
+    if not api_key or not verify_api_key(api_key):
         raise HTTPException(
             status_code=401,
             detail="Invalid API key"
         )
-    return True
+    return api_key
 
 
 @app.get("/")
@@ -84,6 +130,8 @@ async def api_info():
         "endpoints": {
             "analyze": "POST /analyze",
             "results": "GET /results/{id}",
+            "wait": "GET /results/{id}/wait",
+            "stream": "GET /results/stream",
             "health": "GET /health",
             "docs": "GET /docs",
             "ui": "GET /static/index.html"
@@ -93,12 +141,33 @@ async def api_info():
     }
 
 
+async def get_openai_status() -> bool:
+    """Return the OpenAI connection status, probing at most once per HEALTH_CACHE_TTL."""
+    age = time.monotonic() - _health_cache["checked_at"]
+    if _health_cache["openai_status"] is not None and age < HEALTH_CACHE_TTL:
+        return _health_cache["openai_status"]
+    
+    openai_status = await summarizer.test_connection()
+    now = time.monotonic()
+    connected_at = _health_cache["connected_at"]
+    
+    if openai_status:
+        _health_cache["connected_at"] = now
+    elif connected_at is not None and now - connected_at < HEALTH_STALE_TTL:
+        logger.warning(f"OpenAI probe failed, serving last connected status from {now - connected_at:.0f}s ago")
+        openai_status = True
+    
+    _health_cache["checked_at"] = now
+    _health_cache["openai_status"] = openai_status
+    return openai_status
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     try:
-        # Test OpenAI connection
-        openai_status = await summarizer.test_connection()
+        # Test OpenAI connection (cached briefly to keep probes cheap)
+        openai_status = await get_openai_status()
         
         return {
             "status": "healthy",
@@ -112,7 +181,7 @@ async def health_check():
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
@@ -122,16 +191,10 @@ async def health_check():
         )
 
 
-@app.post("/analyze", response_model=Dict[str, str])
-async def analyze_market(
-    request: AnalysisRequest,
-    background_tasks: BackgroundTasks
-):
+@app.post("/analyze", response_model=Dict[str, str], dependencies=[Depends(require_api_key)])
+async def analyze_market(request: AnalysisRequest):
     """Start market analysis process."""
     try:
-        # Authenticate request
-        await authenticate_request(request.api_key)
-        
         # Validate request
         if not request.market.strip():
             raise HTTPException(
@@ -142,16 +205,18 @@ async def analyze_market(
         logger.info(f"Starting analysis for {request.market} in {request.region} over {request.timeframe}")
         
         # Create analysis record
-        analysis_id = storage.create_analysis(request)
+        analysis_id = await storage.create_analysis(request)
         
-        # Start background analysis
-        background_tasks.add_task(
-            perform_analysis,
-            analysis_id,
-            request.market,
-            request.region,
-            request.timeframe
-        )
+        # Queue the analysis for a background worker, shedding load when the queue is full
+        # (waiting here could be cancelled by a client disconnect, stranding the record)
+        try:
+            analysis_queue.put_nowait((analysis_id, request.market, request.region, request.timeframe))
+        except asyncio.QueueFull:
+            await storage.delete_analysis(analysis_id)
+            raise HTTPException(
+                status_code=503,
+                detail="Analysis queue is full, please retry shortly"
+            )
         
         return {
             "analysis_id": analysis_id,
@@ -170,15 +235,57 @@ async def analyze_market(
         )
 
 
-@app.get("/results/{analysis_id}", response_model=AnalysisResult)
-async def get_results(analysis_id: str, api_key: str):
+@app.get("/results/stream", dependencies=[Depends(require_api_key)])
+async def stream_recent_analyses(limit: int = Query(10, ge=1, le=100)):
+    """Stream recent analyses as newline-delimited JSON, one analysis per line."""
+    try:
+        analyses = await storage.list_analyses(limit=limit)
+    except Exception as e:
+        logger.error(f"Error listing analyses: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to list analyses: {str(e)}"
+        )
+    
+    async def generate() -> AsyncIterator[bytes]:
+        # Serialize one analysis at a time so the full list is never encoded at once
+        for analysis in analyses:
+            yield orjson.dumps(analysis.model_dump()) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.get("/results/{analysis_id}", response_model=AnalysisResult, dependencies=[Depends(require_api_key)])
+async def get_results(analysis_id: str):
     """Get analysis results by ID."""
     try:
-        # Authenticate request
-        await authenticate_request(api_key)
+        # Get analysis result, already serialized by storage
+        body = await storage.get_serialized(analysis_id)
+        
+        if not body:
+            raise HTTPException(
+                status_code=404,
+                detail="Analysis not found or expired"
+            )
         
-        # Get analysis result
-        result = storage.get_analysis(analysis_id)
+        return Response(content=body, media_type="application/json")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving results: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve results: {str(e)}"
+        )
+
+
+@app.get("/results/{analysis_id}/wait", response_model=AnalysisResult, dependencies=[Depends(require_api_key)])
+async def wait_for_results(analysis_id: str, timeout: float = Query(60.0, ge=0, le=MAX_WAIT_SECONDS)):
+    """Long-poll for analysis results, returning once the analysis finishes or the timeout elapses."""
+    try:
+        # Wait for the analysis to finish (bounded server-side: NaN and out-of-range timeouts are rejected with 422)
+        result = await storage.wait_for_analysis(analysis_id, timeout=timeout)
         
         if not result:
             raise HTTPException(
@@ -191,22 +298,19 @@ async def get_results(analysis_id: str, api_key: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error retrieving results: {e}")
+        logger.error(f"Error waiting for results: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve results: {str(e)}"
         )
 
 
-@app.get("/results", response_model=List[AnalysisResult])
-async def list_recent_analyses(api_key: str, limit: int = 10):
+@app.get("/results", response_model=List[AnalysisResult], dependencies=[Depends(require_api_key)])
+async def list_recent_analyses(limit: int = Query(10, ge=1, le=100)):
     """List recent analyses."""
     try:
-        # Authenticate request
-        await authenticate_request(api_key)
-        
         # Get recent analyses
-        analyses = storage.list_analyses(limit=limit)
+        analyses = await storage.list_analyses(limit=limit)
         
         return analyses
         
@@ -220,15 +324,12 @@ async def list_recent_analyses(api_key: str, limit: int = 10):
         )
 
 
-@app.delete("/results/{analysis_id}")
-async def delete_analysis(analysis_id: str, api_key: str):
+@app.delete("/results/{analysis_id}", dependencies=[Depends(require_api_key)])
+async def delete_analysis(analysis_id: str):
     """Delete analysis result."""
     try:
-        # Authenticate request
-        await authenticate_request(api_key)
-        
         # Delete analysis
-        success = storage.delete_analysis(analysis_id)
+        success = await storage.delete_analysis(analysis_id)
         
         if not success:
             raise HTTPException(
@@ -248,6 +349,18 @@ async def delete_analysis(analysis_id: str, api_key: str):
         )
 
 
+async def analysis_worker():
+    """Run queued analyses one at a time until cancelled."""
+    while True:
+        analysis_id, market, region, timeframe = await analysis_queue.get()
+        try:
+            await perform_analysis(analysis_id, market, region, timeframe)
+        except Exception as e:
+            logger.error(f"Analysis worker error for {analysis_id}: {e}", exc_info=e)
+        finally:
+            analysis_queue.task_done()
+
+
 async def perform_analysis(analysis_id: str, market: str, region: MarketRegion, timeframe: TimeFrame):
     """Perform the actual market analysis in background."""
     start_time = time.time()
@@ -255,21 +368,21 @@ async def perform_analysis(analysis_id: str, market: str, region: MarketRegion,
     try:
         logger.info(f"Starting analysis {analysis_id} for {market}")
         
-        # Update status to processing
-        storage.update_analysis(analysis_id, status="processing")
-        
-        # Step 1: Collect market data
+        # Step 1: Collect market data while the status update is written
         logger.info(f"Collecting data for {market}")
-        market_data = await data_collector_manager.collect_all_data(market, region, timeframe)
+        _, market_data = await asyncio.gather(
+            storage.update_analysis(analysis_id, status="processing"),
+            data_collector_manager.collect_all_data(market, region, timeframe)
+        )
         
         if not market_data:
             raise Exception("No market data collected")
         
         logger.info(f"Collected {len(market_data)} data points")
         
-        # Step 2: Analyze trends
+        # Step 2: Analyze trends (synchronous, so run it off the event loop)
         logger.info(f"Analyzing trends for {market}")
-        trends = trend_analyzer.analyze_trends(market_data, market, region, timeframe)
+        trends = await asyncio.to_thread(trend_analyzer.analyze_trends, market_data, market, region, timeframe)
         
         if not trends:
             raise Exception("No trends identified")
@@ -284,7 +397,7 @@ async def perform_analysis(analysis_id: str, market: str, region: MarketRegion,
         processing_time = time.time() - start_time
         
         # Update analysis with results
-        storage.update_analysis(
+        await storage.update_analysis(
             analysis_id,
             status="completed",
             market_data=market_data,
@@ -299,7 +412,7 @@ async def perform_analysis(analysis_id: str, market: str, region: MarketRegion,
         logger.error(f"Analysis {analysis_id} failed: {e}")
         
         # Update analysis with error
-        storage.update_analysis(
+        await storage.update_analysis(
             analysis_id,
             status="failed",
             error_message=str(e),
@@ -311,12 +424,12 @@ async def perform_analysis(analysis_id: str, market: str, region: MarketRegion,
 async def global_exception_handler(request, exc):
     """Global exception handler."""
     logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content=ErrorResponse(
             error="Internal server error",
             detail="An unexpected error occurred"
-        ).dict()
+        ).model_dump()
     )
 
 
@@ -326,5 +439,7 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        loop=settings.event_loop,
+        http=settings.http_parser,
         log_level="info"
     )
@@ -1,8 +1,9 @@
 """Data models for CrewInsight MVP."""
 
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any, Tuple
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -25,28 +26,31 @@ class TimeFrame(str, Enum):
 
 class AnalysisRequest(BaseModel):
     """Request model for market analysis."""
+    model_config = ConfigDict(frozen=True)
+    
     market: str = Field(..., description="Market or sector to analyze (e.g., 'technology', 'finance')")
     region: MarketRegion = Field(..., description="Geographic region for analysis")
     timeframe: TimeFrame = Field(..., description="Time period for analysis")
-    api_key: str = Field(..., description="API key for authentication")
 
 
-class TrendData(BaseModel):
-    """Individual trend data."""
+@dataclass(frozen=True, slots=True)
+class TrendData:
+    """Individual trend data (internal and immutable, so built without Pydantic validation)."""
     trend_name: str
     description: str
-    confidence: float = Field(ge=0.0, le=1.0)
-    supporting_data: List[str] = Field(default_factory=list)
-    impact: str = Field(..., description="Expected impact: positive, negative, neutral")
+    confidence: float  # 0.0 to 1.0
+    impact: str  # Expected impact: positive, negative, neutral
+    supporting_data: Tuple[str, ...] = ()
 
 
-class MarketData(BaseModel):
-    """Market data from various sources."""
+@dataclass(slots=True)
+class MarketData:
+    """Market data from various sources (internal, so built without Pydantic validation)."""
     source: str
     data_type: str
     timestamp: datetime
-    raw_data: Dict[str, Any]
     processed_data: Dict[str, Any]
+    raw_data: Optional[Dict[str, Any]] = None
 
 
 class AnalysisResult(BaseModel):
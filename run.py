@@ -15,5 +15,7 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        loop=settings.event_loop,
+        http=settings.http_parser,
         log_level="info"
     )
@@ -1,11 +1,49 @@
-"""In-memory storage for CrewInsight MVP."""
+"""Analysis result storage for CrewInsight MVP (in-memory or Redis)."""
 
+import asyncio
+import os
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from itertools import islice
+from typing import Any, Dict, Optional
 from threading import Lock
 
+import orjson
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
 from models import AnalysisResult, AnalysisRequest
+from config import settings
+
+# Default for update_analysis fields that should be left unchanged
+_UNSET: Any = object()
+
+# HSET only if the analysis hash still exists, so an update racing its expiry or
+# deletion cannot recreate a partial hash without a TTL. Returns 1 if it existed.
+_UPDATE_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if #ARGV > 0 then
+    redis.call('HSET', KEYS[1], unpack(ARGV))
+end
+return 1
+"""
+
+# Trim the index to its newest ARGV[1] entries and delete the evicted analysis
+# hashes (ARGV[2] is the hash key prefix). Returns how many were evicted.
+_TRIM_INDEX_SCRIPT = """
+local evicted = redis.call('ZRANGE', KEYS[1], 0, -tonumber(ARGV[1]) - 1)
+for _, analysis_id in ipairs(evicted) do
+    redis.call('DEL', ARGV[2] .. analysis_id)
+end
+if #evicted > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, #evicted - 1)
+end
+return #evicted
+"""
 
 
 class InMemoryStorage:
@@ -14,12 +52,16 @@ class InMemoryStorage:
     def __init__(self, max_results: int = 1000, ttl_hours: int = 24):
         self.max_results = max_results
         self.ttl_hours = ttl_hours
-        self._results: Dict[str, AnalysisResult] = {}
+        # Insertion order is creation order, so the oldest result is always at the front
+        self._results: OrderedDict[str, AnalysisResult] = OrderedDict()
+        self._completion_events: Dict[str, asyncio.Event] = {}
+        # JSON bodies of results, dropped whenever the result changes
+        self._serialized: Dict[str, bytes] = {}
         self._lock = Lock()
     
-    def create_analysis(self, request: AnalysisRequest) -> str:
+    async def create_analysis(self, request: AnalysisRequest) -> str:
         """Create a new analysis request and return its ID."""
-        analysis_id = str(uuid.uuid4())
+        analysis_id = _new_analysis_id()
         
         result = AnalysisResult(
             id=analysis_id,
@@ -29,67 +71,122 @@ class InMemoryStorage:
         )
         
         with self._lock:
-            # Clean up old results if we're at capacity
+            # Clean up old results if we're at capacity, then evict the oldest if still full
             if len(self._results) >= self.max_results:
                 self._cleanup_old_results()
+                while len(self._results) >= self.max_results:
+                    self._remove(next(iter(self._results)))
             
             self._results[analysis_id] = result
+            self._completion_events[analysis_id] = asyncio.Event()
         
         return analysis_id
     
-    def get_analysis(self, analysis_id: str) -> Optional[AnalysisResult]:
+    async def get_analysis(self, analysis_id: str) -> Optional[AnalysisResult]:
         """Get analysis result by ID."""
         with self._lock:
             result = self._results.get(analysis_id)
             
             # Check if result has expired
             if result and self._is_expired(result):
-                del self._results[analysis_id]
+                self._remove(analysis_id)
                 return None
             
             return result
     
-    def update_analysis(self, analysis_id: str, **updates) -> bool:
+    async def get_serialized(self, analysis_id: str) -> Optional[bytes]:
+        """Get analysis result by ID as a JSON body, serializing it at most once per update."""
+        with self._lock:
+            result = self._results.get(analysis_id)
+            
+            # Check if result has expired
+            if result and self._is_expired(result):
+                self._remove(analysis_id)
+                return None
+            
+            if not result:
+                return None
+            
+            serialized = self._serialized.get(analysis_id)
+            if serialized is None:
+                serialized = self._serialized[analysis_id] = _serialize_result(result)
+            return serialized
+    
+    async def update_analysis(
+        self,
+        analysis_id: str,
+        *,
+        status: Any = _UNSET,
+        market_data: Any = _UNSET,
+        trends: Any = _UNSET,
+        summary: Any = _UNSET,
+        processing_time: Any = _UNSET,
+        error_message: Any = _UNSET
+    ) -> bool:
         """Update analysis result with new data."""
+        updates = _provided_fields(
+            status=status,
+            market_data=market_data,
+            trends=trends,
+            summary=summary,
+            processing_time=processing_time,
+            error_message=error_message
+        )
+        
+        # Update completion timestamp if status changed to completed
+        if status == 'completed':
+            updates['completed_at'] = datetime.now()
+        
         with self._lock:
-            if analysis_id not in self._results:
+            result = self._results.get(analysis_id)
+            if result is None:
                 return False
             
-            result = self._results[analysis_id]
-            
-            # Update fields
-            for key, value in updates.items():
-                if hasattr(result, key):
-                    setattr(result, key, value)
+            # Swap in an updated copy so readers never see a partially updated result
+            result = self._results[analysis_id] = result.model_copy(update=updates)
+            self._serialized.pop(analysis_id, None)
             
-            # Update completion timestamp if status changed to completed
-            if updates.get('status') == 'completed':
-                result.completed_at = datetime.now()
+            # Serialize finished results once now and wake up any clients waiting for them
+            if status in ('completed', 'failed'):
+                self._serialized[analysis_id] = _serialize_result(result)
+                event = self._completion_events.get(analysis_id)
+                if event:
+                    event.set()
             
             return True
     
-    def delete_analysis(self, analysis_id: str) -> bool:
+    async def delete_analysis(self, analysis_id: str) -> bool:
         """Delete analysis result."""
         with self._lock:
             if analysis_id in self._results:
-                del self._results[analysis_id]
+                self._remove(analysis_id)
                 return True
             return False
     
-    def list_analyses(self, limit: int = 50) -> list[AnalysisResult]:
+    async def wait_for_analysis(self, analysis_id: str, timeout: float) -> Optional[AnalysisResult]:
+        """Wait until an analysis completes or fails, or the timeout elapses, then return it."""
+        with self._lock:
+            event = self._completion_events.get(analysis_id)
+        
+        if event:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        
+        return await self.get_analysis(analysis_id)
+    
+    async def list_analyses(self, limit: int = 50) -> list[AnalysisResult]:
         """List recent analyses."""
         with self._lock:
             # Clean up expired results first
             self._cleanup_old_results()
             
-            # Sort by creation time (newest first) and return limited results
-            sorted_results = sorted(
-                self._results.values(),
-                key=lambda x: x.created_at,
-                reverse=True
-            )
-            
-            return sorted_results[:limit]
+            # Results are kept in creation order, so the newest are at the end
+            return list(islice(reversed(self._results.values()), max(limit, 0)))
+    
+    async def aclose(self):
+        """Nothing to release for in-process storage."""
     
     def _is_expired(self, result: AnalysisResult) -> bool:
         """Check if result has expired based on TTL."""
@@ -97,15 +194,199 @@ class InMemoryStorage:
         return datetime.now() > expiry_time
     
     def _cleanup_old_results(self):
-        """Remove expired results."""
-        expired_ids = [
-            analysis_id for analysis_id, result in self._results.items()
-            if self._is_expired(result)
-        ]
+        """Remove expired results from the front of the creation-ordered store."""
+        while self._results:
+            analysis_id, result = next(iter(self._results.items()))
+            if not self._is_expired(result):
+                break
+            self._remove(analysis_id)
+    
+    def _remove(self, analysis_id: str):
+        """Remove a result, its completion event and its cached JSON. Caller must hold the lock."""
+        del self._results[analysis_id]
+        self._completion_events.pop(analysis_id, None)
+        self._serialized.pop(analysis_id, None)
+
+
+class RedisStorage:
+    """Redis-backed storage for analysis results, shared across worker processes.
+    
+    Each analysis is a hash at ``analysis:{id}`` holding one JSON-encoded value per
+    AnalysisResult field, expired by Redis after the TTL. A sorted set scored by
+    creation time indexes analyses for listing. Configure the server with
+    ``maxmemory-policy allkeys-lfu`` so Redis evicts cold results under memory pressure.
+    """
+    
+    INDEX_KEY = "analyses:by_created"
+    WAIT_POLL_INTERVAL = 0.5
+    
+    def __init__(self, redis_url: str, max_results: int = 1000, ttl_hours: int = 24):
+        self.max_results = max_results
+        self.ttl_seconds = ttl_hours * 3600
+        self._redis = Redis.from_url(redis_url)
+        self._update_if_exists = self._redis.register_script(_UPDATE_IF_EXISTS_SCRIPT)
+        self._trim_index = self._redis.register_script(_TRIM_INDEX_SCRIPT)
+    
+    async def create_analysis(self, request: AnalysisRequest) -> str:
+        """Create a new analysis request and return its ID."""
+        analysis_id = _new_analysis_id()
+        created_at = datetime.now()
+        
+        result = AnalysisResult(
+            id=analysis_id,
+            request=request,
+            status="processing",
+            created_at=created_at
+        )
         
-        for analysis_id in expired_ids:
-            del self._results[analysis_id]
+        key = self._key(analysis_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=self._encode_fields(result.model_dump(mode="json")))
+            pipe.expire(key, self.ttl_seconds)
+            pipe.zadd(self.INDEX_KEY, {analysis_id: created_at.timestamp()})
+            # Drop index entries past the TTL (their hashes have expired), then trim to
+            # capacity (oldest first), deleting the evicted hashes along with their entries
+            pipe.zremrangebyscore(self.INDEX_KEY, "-inf", created_at.timestamp() - self.ttl_seconds)
+            await self._trim_index(keys=[self.INDEX_KEY], args=[self.max_results, self._key("")], client=pipe)
+            await pipe.execute()
+        
+        return analysis_id
+    
+    async def get_analysis(self, analysis_id: str) -> Optional[AnalysisResult]:
+        """Get analysis result by ID."""
+        fields = await self._redis.hgetall(self._key(analysis_id))
+        return self._decode_result(fields)
+    
+    async def get_serialized(self, analysis_id: str) -> Optional[bytes]:
+        """Get analysis result by ID as a JSON body, joined from the already-encoded hash fields."""
+        fields = await self._redis.hgetall(self._key(analysis_id))
+        if not fields:
+            return None
+        return b"{" + b",".join(orjson.dumps(field.decode()) + b":" + value for field, value in fields.items()) + b"}"
+    
+    async def update_analysis(
+        self,
+        analysis_id: str,
+        *,
+        status: Any = _UNSET,
+        market_data: Any = _UNSET,
+        trends: Any = _UNSET,
+        summary: Any = _UNSET,
+        processing_time: Any = _UNSET,
+        error_message: Any = _UNSET
+    ) -> bool:
+        """Update analysis result with new data."""
+        updates = _provided_fields(
+            status=status,
+            market_data=market_data,
+            trends=trends,
+            summary=summary,
+            processing_time=processing_time,
+            error_message=error_message
+        )
+        
+        # Update completion timestamp if status changed to completed
+        if status == 'completed':
+            updates['completed_at'] = datetime.now()
+        
+        # Check and write in one atomic script call
+        args = [item for field_value in self._encode_fields(updates).items() for item in field_value]
+        return bool(await self._update_if_exists(keys=[self._key(analysis_id)], args=args))
+    
+    async def delete_analysis(self, analysis_id: str) -> bool:
+        """Delete analysis result."""
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key(analysis_id))
+            pipe.zrem(self.INDEX_KEY, analysis_id)
+            deleted, _ = await pipe.execute()
+        return bool(deleted)
+    
+    async def wait_for_analysis(self, analysis_id: str, timeout: float) -> Optional[AnalysisResult]:
+        """Wait until an analysis completes or fails, or the timeout elapses, then return it."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        while True:
+            result = await self.get_analysis(analysis_id)
+            if not result or result.status in ('completed', 'failed') or loop.time() >= deadline:
+                return result
+            await asyncio.sleep(min(self.WAIT_POLL_INTERVAL, deadline - loop.time()))
+    
+    async def list_analyses(self, limit: int = 50) -> list[AnalysisResult]:
+        """List recent analyses."""
+        # zrevrange treats a stop of -1 as "to the end", so guard non-positive limits explicitly
+        if limit <= 0:
+            return []
+        
+        analysis_ids = await self._redis.zrevrange(self.INDEX_KEY, 0, limit - 1)
+        if not analysis_ids:
+            return []
+        
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for analysis_id in analysis_ids:
+                pipe.hgetall(self._key(analysis_id.decode()))
+            all_fields = await pipe.execute()
+        
+        results = []
+        expired_ids = []
+        for analysis_id, fields in zip(analysis_ids, all_fields):
+            result = self._decode_result(fields)
+            if result:
+                results.append(result)
+            else:
+                expired_ids.append(analysis_id)
+        
+        # Prune index entries whose hashes Redis has already expired
+        if expired_ids:
+            await self._redis.zrem(self.INDEX_KEY, *expired_ids)
+        
+        return results
+    
+    async def aclose(self):
+        """Close the Redis connection pool."""
+        await self._redis.aclose()
+    
+    def _key(self, analysis_id: str) -> str:
+        """Redis key for an analysis hash."""
+        return f"analysis:{analysis_id}"
+    
+    def _encode_fields(self, fields: Dict[str, Any]) -> Dict[str, bytes]:
+        """JSON-encode each field value for storage in a Redis hash."""
+        return {field: orjson.dumps(value, default=_encode_value) for field, value in fields.items()}
+    
+    def _decode_result(self, fields: Dict[bytes, bytes]) -> Optional[AnalysisResult]:
+        """Rebuild an AnalysisResult from a Redis hash, or None if it is missing."""
+        if not fields:
+            return None
+        return AnalysisResult.model_validate(
+            {field.decode(): orjson.loads(value) for field, value in fields.items()}
+        )
+
+
+def _new_analysis_id() -> str:
+    """Generate a time-ordered UUIDv7 string: a millisecond timestamp followed by random bits."""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
+
+def _provided_fields(**fields: Any) -> Dict[str, Any]:
+    """Keep only the update_analysis fields that were actually passed."""
+    return {field: value for field, value in fields.items() if value is not _UNSET}
+
+
+def _serialize_result(result: AnalysisResult) -> bytes:
+    """Encode an analysis result as a JSON response body."""
+    return orjson.dumps(result.model_dump(mode="json"))
+
+
+def _encode_value(value: Any) -> Any:
+    """orjson fallback for Pydantic models nested in update values."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
 
 
-# Global storage instance
-storage = InMemoryStorage()
+# Global storage instance (Redis when configured, otherwise in-process memory)
+storage = RedisStorage(settings.redis_url) if settings.redis_url else InMemoryStorage()
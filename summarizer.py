@@ -1,25 +1,64 @@
 """OpenAI-powered summarization service for market insights."""
 
+import asyncio
 import logging
+import time
+from hashlib import blake2b
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+import httpx
 import openai
 from openai import AsyncOpenAI
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from models import MarketData, TrendData, MarketRegion, TimeFrame
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+_IMPACT_EMOJI = {"positive": "📈", "negative": "📉", "neutral": "➡️"}
+_MAX_SUMMARY_WORDS = 300
+
+
+class OpenAICircuitOpenError(Exception):
+    """Raised instead of calling OpenAI while the rate-limit circuit breaker is open."""
+
 
 class MarketSummarizer:
     """Generates concise market insights using OpenAI."""
     
+    # After this many consecutive rate-limited calls, skip OpenAI for CIRCUIT_OPEN_SECONDS
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_OPEN_SECONDS = 30.0
+    
+    # Instructions closing every prompt, joined once at import time
+    _INSTRUCTIONS = "\n".join([
+        "Please provide a concise business summary (max 300 words) that:",
+        "1. Highlights the most important trends and their implications",
+        "2. Provides actionable insights for business decision-making",
+        "3. Uses clear, professional language suitable for executives",
+        "4. Focuses on practical implications rather than technical details"
+    ])
+    
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+        # Pooled HTTP/2 client so summaries and health probes reuse one warm connection
+        self._http = httpx.AsyncClient(
+            timeout=settings.request_timeout,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            http2=True
+        )
+        self.client = AsyncOpenAI(api_key=settings.openai_api_key, http_client=self._http)
         self.max_tokens = 500  # Keep summary under 300 words
         self.model = "gpt-3.5-turbo"
+        
+        # Summaries are memoized in Redis by prompt hash when Redis is configured
+        self.cache = Redis.from_url(settings.redis_url) if settings.redis_url else None
+        self.cache_ttl = settings.summary_cache_ttl
+        
+        self._rate_limit_failures = 0
+        self._circuit_open_until = 0.0
     
     async def generate_summary(
         self, 
@@ -31,8 +70,8 @@ class MarketSummarizer:
     ) -> str:
         """Generate a concise summary of market insights."""
         try:
-            # Prepare context for the AI
-            context = self._prepare_context(market_data, trends, market, region, timeframe)
+            # Prepare context for the AI (synchronous, so run it off the event loop)
+            context = await asyncio.to_thread(self._prepare_context, market_data, trends, market, region, timeframe)
             
             # Generate summary using OpenAI
             summary = await self._call_openai(context)
@@ -45,39 +84,30 @@ class MarketSummarizer:
             
         except Exception as e:
             logger.error(f"Error generating summary: {e}")
-            return self._generate_fallback_summary(market_data, trends, market, region, timeframe)
+            return await asyncio.to_thread(self._generate_fallback_summary, market_data, trends, market, region, timeframe)
     
     def _prepare_context(self, market_data: List[MarketData], trends: List[TrendData], market: str, region: MarketRegion, timeframe: TimeFrame) -> str:
         """Prepare context for OpenAI summarization."""
-        context_parts = []
-        
-        # Market overview
-        context_parts.append(f"Market Analysis: {market.title()} sector in {region.value} region over {timeframe.value} timeframe")
-        context_parts.append("")
-        
-        # Data sources summary
-        context_parts.append("Data Sources:")
-        for data in market_data:
-            source_summary = self._summarize_data_source(data)
-            context_parts.append(f"- {data.source}: {source_summary}")
+        # Market overview and data sources summary
+        context_parts = [
+            f"Market Analysis: {market.title()} sector in {region.value} region over {timeframe.value} timeframe",
+            "",
+            "Data Sources:"
+        ]
+        context_parts.extend(f"- {data.source}: {self._summarize_data_source(data)}" for data in market_data)
         context_parts.append("")
         
         # Key trends
         context_parts.append("Key Trends Identified:")
         for i, trend in enumerate(trends, 1):
-            impact_emoji = {"positive": "📈", "negative": "📉", "neutral": "➡️"}.get(trend.impact, "➡️")
-            context_parts.append(f"{i}. {impact_emoji} {trend.trend_name} (Confidence: {trend.confidence:.1%})")
+            context_parts.append(f"{i}. {_IMPACT_EMOJI.get(trend.impact, '➡️')} {trend.trend_name} (Confidence: {trend.confidence:.1%})")
             context_parts.append(f"   {trend.description}")
             if trend.supporting_data:
                 context_parts.append(f"   Supporting data: {', '.join(trend.supporting_data[:3])}")
         context_parts.append("")
         
         # Instructions for AI
-        context_parts.append("Please provide a concise business summary (max 300 words) that:")
-        context_parts.append("1. Highlights the most important trends and their implications")
-        context_parts.append("2. Provides actionable insights for business decision-making")
-        context_parts.append("3. Uses clear, professional language suitable for executives")
-        context_parts.append("4. Focuses on practical implications rather than technical details")
+        context_parts.append(self._INSTRUCTIONS)
         
         return "\n".join(context_parts)
     
@@ -98,7 +128,23 @@ class MarketSummarizer:
             return f"Data points: {len(processed)}"
     
     async def _call_openai(self, context: str) -> str:
-        """Call OpenAI API to generate summary."""
+        """Call OpenAI API to generate summary, reusing a cached summary for an identical prompt."""
+        cache_key = f"openai:{blake2b(f'{self.model}:{context}'.encode(), digest_size=16).hexdigest()}"
+        
+        cached = await self._get_cached_summary(cache_key)
+        if cached is not None:
+            logger.info("Using cached OpenAI summary")
+            return cached
+        
+        if time.monotonic() < self._circuit_open_until:
+            raise OpenAICircuitOpenError("OpenAI is rate limiting requests, skipping call")
+        
+        summary = await self._request_summary(context)
+        await self._set_cached_summary(cache_key, summary)
+        return summary
+    
+    async def _request_summary(self, context: str) -> str:
+        """Request a summary from the OpenAI API."""
         try:
             response = await self.client.chat.completions.create(
                 model=self.model,
@@ -119,10 +165,12 @@ class MarketSummarizer:
                 presence_penalty=0.0
             )
             
+            self._rate_limit_failures = 0
             return response.choices[0].message.content.strip()
             
         except openai.RateLimitError:
             logger.warning("OpenAI rate limit exceeded, using fallback summary")
+            self._record_rate_limit()
             raise
         except openai.APIError as e:
             logger.error(f"OpenAI API error: {e}")
@@ -131,20 +179,60 @@ class MarketSummarizer:
             logger.error(f"Unexpected error calling OpenAI: {e}")
             raise
     
+    def _record_rate_limit(self):
+        """Count a rate-limited call, opening the circuit once the threshold is reached."""
+        self._rate_limit_failures += 1
+        if self._rate_limit_failures >= self.CIRCUIT_FAILURE_THRESHOLD:
+            self._circuit_open_until = time.monotonic() + self.CIRCUIT_OPEN_SECONDS
+            logger.warning(f"OpenAI rate limited {self._rate_limit_failures} times in a row, skipping OpenAI for {self.CIRCUIT_OPEN_SECONDS:.0f}s")
+    
+    async def _get_cached_summary(self, key: str) -> Optional[str]:
+        """Get a cached summary, treating cache errors as a miss."""
+        if not self.cache:
+            return None
+        try:
+            cached = await self.cache.get(key)
+        except RedisError as e:
+            logger.warning(f"Summary cache read failed: {e}")
+            return None
+        return cached.decode() if cached is not None else None
+    
+    async def _set_cached_summary(self, key: str, summary: str):
+        """Cache a summary for the configured TTL, ignoring cache errors."""
+        if not self.cache:
+            return
+        try:
+            await self.cache.set(key, summary, ex=self.cache_ttl)
+        except RedisError as e:
+            logger.warning(f"Summary cache write failed: {e}")
+    
     def _truncate_summary(self, summary: str) -> str:
         """Ensure summary is within word limit."""
-        words = summary.split()
-        if len(words) <= 300:
+        # Split off at most one word past the limit instead of splitting the whole text
+        words = summary.split(maxsplit=_MAX_SUMMARY_WORDS)
+        if len(words) <= _MAX_SUMMARY_WORDS:
             return summary
         
         # Truncate to 300 words and add ellipsis
-        truncated_words = words[:300]
-        return " ".join(truncated_words) + "..."
+        return " ".join(words[:_MAX_SUMMARY_WORDS]) + "..."
     
     def _generate_fallback_summary(self, market_data: List[MarketData], trends: List[TrendData], market: str, region: MarketRegion, timeframe: TimeFrame) -> str:
         """Generate a fallback summary when OpenAI is unavailable."""
         logger.info("Generating fallback summary")
         
+        # Group trends by impact and note any high-confidence trend in a single pass
+        trends_by_impact: Dict[str, List[TrendData]] = {"positive": [], "negative": [], "neutral": []}
+        has_high_confidence = False
+        for trend in trends:
+            bucket = trends_by_impact.get(trend.impact)
+            if bucket is not None:
+                bucket.append(trend)
+            if trend.confidence > 0.7:
+                has_high_confidence = True
+        positive_trends = trends_by_impact["positive"]
+        negative_trends = trends_by_impact["negative"]
+        neutral_trends = trends_by_impact["neutral"]
+        
         summary_parts = []
         
         # Header
@@ -155,26 +243,20 @@ class MarketSummarizer:
         # Key findings
         summary_parts.append("Key Findings:")
         
-        if trends:
-            # Group trends by impact
-            positive_trends = [t for t in trends if t.impact == "positive"]
-            negative_trends = [t for t in trends if t.impact == "negative"]
-            neutral_trends = [t for t in trends if t.impact == "neutral"]
-            
-            if positive_trends:
-                summary_parts.append("📈 Positive Trends:")
-                for trend in positive_trends[:2]:  # Top 2 positive trends
-                    summary_parts.append(f"• {trend.trend_name}: {trend.description}")
-            
-            if negative_trends:
-                summary_parts.append("📉 Areas of Concern:")
-                for trend in negative_trends[:2]:  # Top 2 negative trends
-                    summary_parts.append(f"• {trend.trend_name}: {trend.description}")
-            
-            if neutral_trends:
-                summary_parts.append("➡️ Neutral Observations:")
-                for trend in neutral_trends[:1]:  # Top 1 neutral trend
-                    summary_parts.append(f"• {trend.trend_name}: {trend.description}")
+        if positive_trends:
+            summary_parts.append("📈 Positive Trends:")
+            for trend in positive_trends[:2]:  # Top 2 positive trends
+                summary_parts.append(f"• {trend.trend_name}: {trend.description}")
+        
+        if negative_trends:
+            summary_parts.append("📉 Areas of Concern:")
+            for trend in negative_trends[:2]:  # Top 2 negative trends
+                summary_parts.append(f"• {trend.trend_name}: {trend.description}")
+        
+        if neutral_trends:
+            summary_parts.append("➡️ Neutral Observations:")
+            for trend in neutral_trends[:1]:  # Top 1 neutral trend
+                summary_parts.append(f"• {trend.trend_name}: {trend.description}")
         
         # Data insights
         summary_parts.append("")
@@ -197,18 +279,14 @@ class MarketSummarizer:
         summary_parts.append("")
         summary_parts.append("Recommendations:")
         
-        if trends:
-            high_confidence_trends = [t for t in trends if t.confidence > 0.7]
-            if high_confidence_trends:
-                summary_parts.append("• Monitor high-confidence trends closely for strategic planning")
-            
-            positive_trends = [t for t in trends if t.impact == "positive"]
-            if positive_trends:
-                summary_parts.append("• Consider capitalizing on positive market momentum")
-            
-            negative_trends = [t for t in trends if t.impact == "negative"]
-            if negative_trends:
-                summary_parts.append("• Develop risk mitigation strategies for identified concerns")
+        if has_high_confidence:
+            summary_parts.append("• Monitor high-confidence trends closely for strategic planning")
+        
+        if positive_trends:
+            summary_parts.append("• Consider capitalizing on positive market momentum")
+        
+        if negative_trends:
+            summary_parts.append("• Develop risk mitigation strategies for identified concerns")
         
         summary_parts.append("• Continue monitoring market conditions for emerging opportunities")
         
@@ -220,6 +298,12 @@ class MarketSummarizer:
         full_summary = "\n".join(summary_parts)
         return self._truncate_summary(full_summary)
     
+    async def aclose(self):
+        """Close the OpenAI HTTP client and the summary cache connection pool."""
+        await self.client.close()
+        if self.cache:
+            await self.cache.aclose()
+    
     async def test_connection(self) -> bool:
         """Test OpenAI API connection."""
         try:
@@ -1,51 +1,100 @@
 """Basic API tests for CrewInsight MVP."""
 
 import asyncio
+import contextvars
 import httpx
 import json
+import orjson
+import random
+import sys
 import time
-from typing import Dict, Any
+from typing import Awaitable, Dict, Any, List, Optional
+
+try:
+    import ijson
+except ImportError:  # Optional: without it status checks parse the whole response body
+    ijson = None
+
+# Output lines of the test running in the current task, flushed in one write when it finishes
+_test_output: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("test_output", default=None)
 
 
 class CrewInsightTester:
     """Test client for CrewInsight API."""
     
-    def __init__(self, base_url: str = "http://localhost:8000", api_key: str = "crewinsight-mvp-2024"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: str = "crewinsight-mvp-2024",
+        poll_initial_delay: float = 0.2,
+        poll_max_delay: float = 5.0,
+        long_poll_timeout: float = 30.0
+    ):
         self.base_url = base_url
         self.api_key = api_key
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # The server holds each status request open for up to long_poll_timeout seconds;
+        # retries after errors back off exponentially from the initial delay up to the cap
+        self.long_poll_timeout = long_poll_timeout
+        self.poll_initial_delay = poll_initial_delay
+        self.poll_max_delay = poll_max_delay
+        # One pooled HTTP/2 client reused for every request in the run, authenticated by default
+        # and asking for gzip, the encoding the server's GZip middleware applies to large results
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=30.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            headers={"X-API-Key": api_key, "Accept-Encoding": "gzip"}
+        )
+    
+    async def __aenter__(self) -> "CrewInsightTester":
+        """Enter the tester context."""
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        """Close the HTTP client on exit."""
+        await self.close()
+    
+    def _log(self, message: str):
+        """Buffer a line of output for the running test, or print it directly outside one."""
+        lines = _test_output.get()
+        if lines is None:
+            print(message)
+        else:
+            lines.append(message)
     
     async def test_health_check(self) -> bool:
         """Test health check endpoint."""
         try:
-            response = await self.client.get(f"{self.base_url}/health")
+            response = await self.client.get("/health")
             if response.status_code == 200:
-                data = response.json()
-                print("✅ Health check passed")
-                print(f"   Status: {data.get('status')}")
-                print(f"   Services: {data.get('services', {})}")
+                data = orjson.loads(response.content)
+                self._log("✅ Health check passed")
+                self._log(f"   Status: {data.get('status')}")
+                self._log(f"   Services: {data.get('services', {})}")
+                self._log(f"   Protocol: {response.http_version}")
                 return True
             else:
-                print(f"❌ Health check failed: {response.status_code}")
+                self._log(f"❌ Health check failed: {response.status_code}")
                 return False
         except Exception as e:
-            print(f"❌ Health check error: {e}")
+            self._log(f"❌ Health check error: {e}")
             return False
     
     async def test_root_endpoint(self) -> bool:
         """Test root endpoint."""
         try:
-            response = await self.client.get(f"{self.base_url}/")
+            response = await self.client.get("/")
             if response.status_code == 200:
-                data = response.json()
-                print("✅ Root endpoint working")
-                print(f"   Message: {data.get('message')}")
+                data = orjson.loads(response.content)
+                self._log("✅ Root endpoint working")
+                self._log(f"   Message: {data.get('message')}")
                 return True
             else:
-                print(f"❌ Root endpoint failed: {response.status_code}")
+                self._log(f"❌ Root endpoint failed: {response.status_code}")
                 return False
         except Exception as e:
-            print(f"❌ Root endpoint error: {e}")
+            self._log(f"❌ Root endpoint error: {e}")
             return False
     
     async def test_analyze_endpoint(self) -> str:
@@ -54,53 +103,53 @@ class CrewInsightTester:
             payload = {
                 "market": "technology",
                 "region": "US",
-                "timeframe": "1w",
-                "api_key": self.api_key
+                "timeframe": "1w"
             }
             
             response = await self.client.post(
-                f"{self.base_url}/analyze",
-                json=payload
+                "/analyze",
+                content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"}
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 analysis_id = data.get("analysis_id")
-                print("✅ Analysis started successfully")
-                print(f"   Analysis ID: {analysis_id}")
-                print(f"   Status: {data.get('status')}")
+                self._log("✅ Analysis started successfully")
+                self._log(f"   Analysis ID: {analysis_id}")
+                self._log(f"   Status: {data.get('status')}")
                 return analysis_id
             else:
-                print(f"❌ Analysis failed: {response.status_code}")
-                print(f"   Response: {response.text}")
+                self._log(f"❌ Analysis failed: {response.status_code}")
+                self._log(f"   Response: {response.text}")
                 return None
                 
         except Exception as e:
-            print(f"❌ Analysis error: {e}")
+            self._log(f"❌ Analysis error: {e}")
             return None
     
     async def test_results_endpoint(self, analysis_id: str) -> bool:
         """Test results endpoint."""
         try:
             response = await self.client.get(
-                f"{self.base_url}/results/{analysis_id}",
-                params={"api_key": self.api_key}
+                f"/results/{analysis_id}"
             )
             
             if response.status_code == 200:
-                data = response.json()
-                print("✅ Results retrieved successfully")
-                print(f"   Status: {data.get('status')}")
-                print(f"   Trends found: {len(data.get('trends', []))}")
-                print(f"   Summary length: {len(data.get('summary', ''))}")
+                data = orjson.loads(response.content)
+                self._log("✅ Results retrieved successfully")
+                self._log(f"   Status: {data.get('status')}")
+                self._log(f"   Trends found: {len(data.get('trends', []))}")
+                self._log(f"   Summary length: {len(data.get('summary', ''))}")
+                self._log(f"   Content-Encoding: {response.headers.get('content-encoding', 'identity')}")
                 return True
             else:
-                print(f"❌ Results failed: {response.status_code}")
-                print(f"   Response: {response.text}")
+                self._log(f"❌ Results failed: {response.status_code}")
+                self._log(f"   Response: {response.text}")
                 return False
                 
         except Exception as e:
-            print(f"❌ Results error: {e}")
+            self._log(f"❌ Results error: {e}")
             return False
     
     async def test_invalid_api_key(self) -> bool:
@@ -109,82 +158,134 @@ class CrewInsightTester:
             payload = {
                 "market": "technology",
                 "region": "US",
-                "timeframe": "1w",
-                "api_key": "invalid-key"
+                "timeframe": "1w"
             }
             
             response = await self.client.post(
-                f"{self.base_url}/analyze",
-                json=payload
+                "/analyze",
+                content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json", "X-API-Key": "invalid-key"}
             )
             
             if response.status_code == 401:
-                print("✅ Invalid API key properly rejected")
+                self._log("✅ Invalid API key properly rejected")
                 return True
             else:
-                print(f"❌ Invalid API key not rejected: {response.status_code}")
+                self._log(f"❌ Invalid API key not rejected: {response.status_code}")
                 return False
                 
         except Exception as e:
-            print(f"❌ Invalid API key test error: {e}")
+            self._log(f"❌ Invalid API key test error: {e}")
+            return False
+    
+    async def test_invalid_wait_timeout(self) -> bool:
+        """Test that NaN, negative and too-large long-poll timeouts are rejected."""
+        try:
+            rejected = True
+            for timeout in ("nan", "-1", "1000"):
+                # Validation runs before the lookup, so no real analysis ID is needed
+                response = await self.client.get("/results/unknown/wait", params={"timeout": timeout})
+                if response.status_code != 422:
+                    self._log(f"❌ Wait timeout {timeout} not rejected: {response.status_code}")
+                    rejected = False
+            
+            if rejected:
+                self._log("✅ Invalid wait timeouts properly rejected")
+            return rejected
+                
+        except Exception as e:
+            self._log(f"❌ Invalid wait timeout test error: {e}")
             return False
     
     async def test_list_analyses(self) -> bool:
         """Test list analyses endpoint."""
         try:
             response = await self.client.get(
-                f"{self.base_url}/results",
-                params={"api_key": self.api_key}
+                "/results"
             )
             
             if response.status_code == 200:
-                data = response.json()
-                print("✅ List analyses working")
-                print(f"   Found {len(data)} analyses")
+                data = orjson.loads(response.content)
+                self._log("✅ List analyses working")
+                self._log(f"   Found {len(data)} analyses")
                 return True
             else:
-                print(f"❌ List analyses failed: {response.status_code}")
+                self._log(f"❌ List analyses failed: {response.status_code}")
                 return False
                 
         except Exception as e:
-            print(f"❌ List analyses error: {e}")
+            self._log(f"❌ List analyses error: {e}")
             return False
     
-    async def wait_for_analysis_completion(self, analysis_id: str, max_wait: int = 120) -> bool:
-        """Wait for analysis to complete."""
-        print(f"⏳ Waiting for analysis {analysis_id} to complete...")
+    async def wait_for_analysis_completion(self, analysis_id: str, max_wait: float = 120) -> bool:
+        """Wait for analysis to complete by long-polling the server for up to max_wait seconds."""
+        self._log(f"⏳ Waiting for analysis {analysis_id} to complete...")
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+        delay = self.poll_initial_delay
         
-        for i in range(max_wait):
+        while loop.time() < deadline:
+            wait = min(self.long_poll_timeout, deadline - loop.time())
             try:
-                response = await self.client.get(
-                    f"{self.base_url}/results/{analysis_id}",
-                    params={"api_key": self.api_key}
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    status = data.get("status")
-                    
-                    if status == "completed":
-                        print("✅ Analysis completed successfully")
-                        return True
-                    elif status == "failed":
-                        print(f"❌ Analysis failed: {data.get('error_message')}")
-                        return False
+                # The server responds as soon as the analysis finishes, or after `wait` seconds
+                async with self.client.stream(
+                    "GET",
+                    f"/results/{analysis_id}/wait",
+                    params={"timeout": wait},
+                    timeout=wait + 30.0
+                ) as response:
+                    if response.status_code == 200:
+                        status = await self._read_status(response)
                     else:
-                        print(f"   Status: {status} (waiting...)")
-                        await asyncio.sleep(1)
-                else:
-                    print(f"   Error checking status: {response.status_code}")
-                    await asyncio.sleep(1)
+                        status = None
+                        self._log(f"   Error checking status: {response.status_code}")
+                
+                if status == "completed":
+                    self._log("✅ Analysis completed successfully")
+                    return True
+                elif status == "failed":
+                    # Only the status was decoded, so fetch the full result for the error message
+                    response = await self.client.get(f"/results/{analysis_id}")
+                    self._log(f"❌ Analysis failed: {orjson.loads(response.content).get('error_message')}")
+                    return False
+                elif status is not None:
+                    # The server already waited, so ask again straight away
+                    self._log(f"   Status: {status} (waiting...)")
+                    continue
                     
             except Exception as e:
-                print(f"   Error checking status: {e}")
-                await asyncio.sleep(1)
+                self._log(f"   Error checking status: {e}")
+            
+            await asyncio.sleep(min(delay, max(deadline - loop.time(), 0)))
+            delay = min(delay * 1.5 + random.uniform(0, 0.1), self.poll_max_delay)
         
-        print("⏰ Analysis timed out")
+        self._log("⏰ Analysis timed out")
         return False
     
+    async def _read_status(self, response: httpx.Response) -> Optional[str]:
+        """Decode the top-level status of a streamed result, stopping as soon as it has been parsed."""
+        if ijson is None:
+            return orjson.loads(await response.aread()).get("status")
+        
+        statuses = ijson.sendable_list()
+        parser = ijson.items_coro(statuses, "status")
+        async for chunk in response.aiter_bytes():
+            parser.send(chunk)
+            if statuses:
+                return statuses[0]
+        return None
+    
+    async def _run_test(self, test: Awaitable[Any]) -> Any:
+        """Run one test, then write its buffered output and a separating blank line in one go."""
+        lines = []
+        token = _test_output.set(lines)
+        try:
+            return await test
+        finally:
+            _test_output.reset(token)
+            sys.stdout.write("\n".join(lines) + "\n\n")
+    
     async def run_full_test(self) -> bool:
         """Run complete test suite."""
         print("🚀 Starting CrewInsight MVP API Tests")
@@ -193,48 +294,39 @@ class CrewInsightTester:
         tests_passed = 0
         total_tests = 0
         
-        # Test 1: Health check
-        total_tests += 1
-        if await self.test_health_check():
-            tests_passed += 1
-        print()
-        
-        # Test 2: Root endpoint
-        total_tests += 1
-        if await self.test_root_endpoint():
-            tests_passed += 1
-        print()
+        # Test 5: Start analysis first, since it is the slowest step
+        analysis_task = asyncio.create_task(self._run_test(self.test_analyze_endpoint()))
         
-        # Test 3: Invalid API key
-        total_tests += 1
-        if await self.test_invalid_api_key():
-            tests_passed += 1
-        print()
+        # Tests 1-4: Health check, root endpoint, invalid API key and wait timeouts (independent, run while the analysis starts)
+        results = await asyncio.gather(
+            self._run_test(self.test_health_check()),
+            self._run_test(self.test_root_endpoint()),
+            self._run_test(self.test_invalid_api_key()),
+            self._run_test(self.test_invalid_wait_timeout()),
+            return_exceptions=True
+        )
+        total_tests += len(results)
+        tests_passed += sum(1 for r in results if r is True)
         
-        # Test 4: Start analysis
         total_tests += 1
-        analysis_id = await self.test_analyze_endpoint()
+        analysis_id = await analysis_task
         if analysis_id:
             tests_passed += 1
-        print()
         
-        # Test 5: Wait for completion and get results
+        # Test 6: Wait for completion
         if analysis_id:
             total_tests += 1
             if await self.wait_for_analysis_completion(analysis_id):
                 tests_passed += 1
             print()
-            
-            total_tests += 1
-            if await self.test_results_endpoint(analysis_id):
-                tests_passed += 1
-            print()
         
-        # Test 6: List analyses
-        total_tests += 1
-        if await self.test_list_analyses():
-            tests_passed += 1
-        print()
+        # Tests 7-8: Get results and list analyses (independent, run concurrently)
+        post_tests = [self.test_list_analyses()]
+        if analysis_id:
+            post_tests.insert(0, self.test_results_endpoint(analysis_id))
+        results = await asyncio.gather(*(self._run_test(test) for test in post_tests), return_exceptions=True)
+        total_tests += len(results)
+        tests_passed += sum(1 for r in results if r is True)
         
         # Summary
         print("=" * 50)
@@ -254,19 +346,16 @@ class CrewInsightTester:
 
 async def main():
     """Run the test suite."""
-    tester = CrewInsightTester()
-    
-    try:
-        success = await tester.run_full_test()
-        exit_code = 0 if success else 1
-    except KeyboardInterrupt:
-        print("\n⏹️  Tests interrupted by user")
-        exit_code = 1
-    except Exception as e:
-        print(f"\n💥 Test suite crashed: {e}")
-        exit_code = 1
-    finally:
-        await tester.close()
+    async with CrewInsightTester() as tester:
+        try:
+            success = await tester.run_full_test()
+            exit_code = 0 if success else 1
+        except KeyboardInterrupt:
+            print("\n⏹️  Tests interrupted by user")
+            exit_code = 1
+        except Exception as e:
+            print(f"\n💥 Test suite crashed: {e}")
+            exit_code = 1
     
     return exit_code
 
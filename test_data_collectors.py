@@ -0,0 +1,43 @@
+"""Unit tests for CrewInsight MVP data collectors."""
+
+import math
+import warnings
+
+from data_collectors import AlphaVantageCollector, NewsCollector
+
+
+def test_sentiment_matches_es_plurals():
+    """'-es' plurals such as "losses" still count toward sentiment."""
+    score, _ = NewsCollector()._analyze_article("Bank reports heavy losses")
+    assert score < 0
+
+
+def test_sentiment_matches_s_plurals():
+    """Plain '-s' plurals such as "gains" still count toward sentiment."""
+    score, _ = NewsCollector()._analyze_article("Bank reports strong gains")
+    assert score > 0
+
+
+def test_bulk_timeseries_zero_close():
+    """A zero close yields finite statistics without NumPy warnings."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        stats = AlphaVantageCollector().bulk_process_timeseries({
+            "ZERO_OLDEST": [105.0, 100.0, 0.0],
+            "ZERO_MIDDLE": [105.0, 0.0, 100.0],
+            "NORMAL": [152.5, 151.25, 150.0]
+        })
+    
+    assert stats["ZERO_OLDEST"]["price_change_percent"] == 0.0
+    assert stats["ZERO_MIDDLE"]["volatility"] == 0.0
+    for series in stats.values():
+        assert math.isfinite(series["price_change_percent"])
+        assert math.isfinite(series["volatility"])
+    assert stats["NORMAL"]["price_change_percent"] > 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -1,14 +1,99 @@
 """Trend analysis engine for identifying market trends."""
 
+import heapq
 import logging
-from typing import List, Dict, Any, Tuple
+import re
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from operator import attrgetter
 import statistics
 
 from models import MarketData, TrendData, MarketRegion, TimeFrame
 
 logger = logging.getLogger(__name__)
 
+# Decimal or exponent notation, as sent for Alpha Vantage ratios (rejects "None", "-", etc.)
+_NUMERIC_RE = re.compile(r"\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*")
+
+# Price trend -> (trend name, direction wording, impact)
+_PRICE_MOMENTUM_TRENDS = {
+    "up": ("Positive Price Momentum", "upward", "positive"),
+    "down": ("Negative Price Momentum", "downward", "negative"),
+}
+
+# Sentiment trend -> (trend name, description lead, impact, sign the average sentiment must have)
+_SENTIMENT_TRENDS = {
+    "positive": ("Positive Market Sentiment", "Strong positive sentiment", "positive", 1),
+    "negative": ("Negative Market Sentiment", "Negative sentiment", "negative", -1),
+}
+
+# Economic health -> (trend name, description, confidence, impact, detail line template)
+_ECONOMIC_HEALTH_TRENDS = {
+    "good": (
+        "Strong Economic Fundamentals",
+        "Economic indicators show positive fundamentals supporting market growth",
+        0.8,
+        "positive",
+        "Key risks: {key_risks}"
+    ),
+    "moderate": (
+        "Mixed Economic Signals",
+        "Economic indicators show mixed signals with moderate growth prospects",
+        0.6,
+        "neutral",
+        "Market conditions: {conditions}"
+    ),
+}
+
+# Market-name keywords -> shared trend for that sector. Keywords are matched as
+# substrings of the lowercased market, so "tech" also covers "technology".
+_SECTOR_TRENDS = (
+    (("tech",), TrendData(
+        trend_name="Technology Innovation Drive",
+        description="Technology sector continues to drive innovation with strong growth potential",
+        confidence=0.8,
+        supporting_data=(
+            "High R&D investment",
+            "Digital transformation acceleration",
+            "AI and automation adoption"
+        ),
+        impact="positive"
+    )),
+    (("finance", "financial"), TrendData(
+        trend_name="Financial Services Evolution",
+        description="Financial services sector adapting to digital transformation and regulatory changes",
+        confidence=0.7,
+        supporting_data=(
+            "Fintech disruption",
+            "Regulatory compliance focus",
+            "Interest rate sensitivity"
+        ),
+        impact="neutral"
+    )),
+    (("health",), TrendData(
+        trend_name="Healthcare Innovation Growth",
+        description="Healthcare sector benefiting from innovation and demographic trends",
+        confidence=0.8,
+        supporting_data=(
+            "Aging population",
+            "Medical technology advances",
+            "Regulatory approval pipeline"
+        ),
+        impact="positive"
+    )),
+    (("energy",), TrendData(
+        trend_name="Energy Transition Impact",
+        description="Energy sector navigating transition to renewable sources",
+        confidence=0.7,
+        supporting_data=(
+            "Renewable energy growth",
+            "Fossil fuel transition",
+            "Geopolitical factors"
+        ),
+        impact="neutral"
+    )),
+)
+
 
 class TrendAnalyzer:
     """Analyzes market data to identify key trends."""
@@ -21,317 +106,236 @@ class TrendAnalyzer:
         """Analyze market data and identify key trends."""
         logger.info(f"Analyzing trends for {market} in {region} over {timeframe}")
         
-        trends = []
+        price_trends = []
+        sentiment_trends = []
+        economic_trends = []
+        sector_data = None
         
-        # Analyze different types of trends
-        price_trends = self._analyze_price_trends(market_data)
-        sentiment_trends = self._analyze_sentiment_trends(market_data)
-        economic_trends = self._analyze_economic_trends(market_data)
-        sector_trends = self._analyze_sector_trends(market_data, market)
+        # Analyze different types of trends in a single pass, dispatching each record on its source
+        for data in market_data:
+            source = data.source
+            processed_data = data.processed_data
+            
+            if source == "Alpha Vantage":
+                if "price_trend" in processed_data:
+                    price_trends.extend(self._analyze_price_trends(processed_data))
+            elif source == "Financial News":
+                if "sentiment_trend" in processed_data:
+                    sentiment_trends.extend(self._analyze_sentiment_trends(processed_data))
+            elif source == "Economic Indicators":
+                economic_trends.extend(self._analyze_economic_trends(processed_data))
+            
+            # The first record carrying sector data drives the sector trends
+            if sector_data is None and "sector" in processed_data:
+                sector_data = processed_data
+        
+        sector_trends = self._analyze_sector_trends(sector_data, market)
         
         # Combine all trends
         all_trends = price_trends + sentiment_trends + economic_trends + sector_trends
         
-        # Filter and rank trends by confidence
-        filtered_trends = [trend for trend in all_trends if trend.confidence >= self.min_confidence_threshold]
-        sorted_trends = sorted(filtered_trends, key=lambda x: x.confidence, reverse=True)
-        
-        # Return top trends
-        return sorted_trends[:self.max_trends]
+        # Filter and return the top trends by confidence, without sorting them all
+        min_confidence = self.min_confidence_threshold
+        return heapq.nlargest(
+            self.max_trends,
+            (trend for trend in all_trends if trend.confidence >= min_confidence),
+            key=attrgetter("confidence")
+        )
     
-    def _analyze_price_trends(self, market_data: List[MarketData]) -> List[TrendData]:
-        """Analyze price-related trends."""
+    def _analyze_price_trends(self, price_data: Dict[str, Any]) -> List[TrendData]:
+        """Analyze price-related trends from one Alpha Vantage record."""
         trends = []
         
-        for data in market_data:
-            if data.source == "Alpha Vantage" and "price_trend" in data.processed_data:
-                price_data = data.processed_data
-                
-                # Price movement trend
-                if price_data.get("price_trend") == "up":
-                    trend = TrendData(
-                        trend_name="Positive Price Momentum",
-                        description=f"Market showing upward price movement with {price_data.get('price_change_percent', 0):.2f}% change",
-                        confidence=min(0.9, abs(price_data.get('price_change_percent', 0)) / 10),
-                        supporting_data=[
-                            f"Price change: {price_data.get('price_change_percent', 0):.2f}%",
-                            f"Volatility: {price_data.get('volatility', 0):.2f}%"
-                        ],
-                        impact="positive"
-                    )
-                    trends.append(trend)
-                
-                elif price_data.get("price_trend") == "down":
-                    trend = TrendData(
-                        trend_name="Negative Price Momentum",
-                        description=f"Market showing downward price movement with {price_data.get('price_change_percent', 0):.2f}% change",
-                        confidence=min(0.9, abs(price_data.get('price_change_percent', 0)) / 10),
-                        supporting_data=[
-                            f"Price change: {price_data.get('price_change_percent', 0):.2f}%",
-                            f"Volatility: {price_data.get('volatility', 0):.2f}%"
-                        ],
-                        impact="negative"
-                    )
-                    trends.append(trend)
-                
-                # Volatility trend
-                volatility = price_data.get('volatility', 0)
-                if volatility > 20:
-                    trend = TrendData(
-                        trend_name="High Market Volatility",
-                        description=f"Market experiencing high volatility at {volatility:.2f}%",
-                        confidence=min(0.8, volatility / 30),
-                        supporting_data=[
-                            f"Volatility level: {volatility:.2f}%",
-                            f"Data points analyzed: {price_data.get('data_points', 0)}"
-                        ],
-                        impact="neutral"
-                    )
-                    trends.append(trend)
+        price_change = price_data.get('price_change_percent', 0)
+        volatility = price_data.get('volatility', 0)
+        
+        # Price movement trend (text is only formatted for trends that pass the confidence threshold)
+        momentum = _PRICE_MOMENTUM_TRENDS.get(price_data.get("price_trend"))
+        confidence = min(0.9, abs(price_change) / 10)
+        if momentum and confidence >= self.min_confidence_threshold:
+            trend_name, direction, impact = momentum
+            price_change_text = f"{price_change:.2f}%"
+            trend = TrendData(
+                trend_name=trend_name,
+                description=f"Market showing {direction} price movement with {price_change_text} change",
+                confidence=confidence,
+                supporting_data=(
+                    f"Price change: {price_change_text}",
+                    f"Volatility: {volatility:.2f}%"
+                ),
+                impact=impact
+            )
+            trends.append(trend)
+        
+        # Volatility trend
+        confidence = min(0.8, volatility / 30)
+        if volatility > 20 and confidence >= self.min_confidence_threshold:
+            volatility_text = f"{volatility:.2f}%"
+            trend = TrendData(
+                trend_name="High Market Volatility",
+                description=f"Market experiencing high volatility at {volatility_text}",
+                confidence=confidence,
+                supporting_data=(
+                    f"Volatility level: {volatility_text}",
+                    f"Data points analyzed: {price_data.get('data_points', 0)}"
+                ),
+                impact="neutral"
+            )
+            trends.append(trend)
         
         return trends
     
-    def _analyze_sentiment_trends(self, market_data: List[MarketData]) -> List[TrendData]:
-        """Analyze sentiment-related trends from news data."""
+    def _analyze_sentiment_trends(self, sentiment_data: Dict[str, Any]) -> List[TrendData]:
+        """Analyze sentiment-related trends from one news record."""
         trends = []
         
-        for data in market_data:
-            if data.source == "Financial News" and "sentiment_trend" in data.processed_data:
-                sentiment_data = data.processed_data
-                
-                sentiment = sentiment_data.get("sentiment_trend", "neutral")
-                avg_sentiment = sentiment_data.get("avg_sentiment", 0)
-                news_volume = sentiment_data.get("news_volume", 0)
-                
-                if sentiment == "positive" and avg_sentiment > 0.2:
-                    trend = TrendData(
-                        trend_name="Positive Market Sentiment",
-                        description=f"Strong positive sentiment in news coverage with {news_volume} articles analyzed",
-                        confidence=min(0.9, avg_sentiment * 2),
-                        supporting_data=[
-                            f"Average sentiment score: {avg_sentiment:.3f}",
-                            f"News volume: {news_volume} articles",
-                            f"Top themes: {', '.join(sentiment_data.get('top_themes', [])[:3])}"
-                        ],
-                        impact="positive"
-                    )
-                    trends.append(trend)
-                
-                elif sentiment == "negative" and avg_sentiment < -0.2:
-                    trend = TrendData(
-                        trend_name="Negative Market Sentiment",
-                        description=f"Negative sentiment in news coverage with {news_volume} articles analyzed",
-                        confidence=min(0.9, abs(avg_sentiment) * 2),
-                        supporting_data=[
-                            f"Average sentiment score: {avg_sentiment:.3f}",
-                            f"News volume: {news_volume} articles",
-                            f"Top themes: {', '.join(sentiment_data.get('top_themes', [])[:3])}"
-                        ],
-                        impact="negative"
-                    )
-                    trends.append(trend)
-                
-                # News volume trend
-                if news_volume > 50:
-                    trend = TrendData(
-                        trend_name="High News Volume",
-                        description=f"Significant media attention with {news_volume} articles in the timeframe",
-                        confidence=min(0.7, news_volume / 100),
-                        supporting_data=[
-                            f"Article count: {news_volume}",
-                            f"Sentiment trend: {sentiment}"
-                        ],
-                        impact="neutral"
-                    )
-                    trends.append(trend)
+        sentiment = sentiment_data.get("sentiment_trend", "neutral")
+        avg_sentiment = sentiment_data.get("avg_sentiment", 0)
+        news_volume = sentiment_data.get("news_volume", 0)
+        
+        # Sentiment trend, when the average score is strong enough in the same direction
+        sentiment_trend = _SENTIMENT_TRENDS.get(sentiment)
+        confidence = min(0.9, abs(avg_sentiment) * 2)
+        if sentiment_trend and avg_sentiment * sentiment_trend[3] > 0.2 and confidence >= self.min_confidence_threshold:
+            trend_name, description_lead, impact, _ = sentiment_trend
+            trend = TrendData(
+                trend_name=trend_name,
+                description=f"{description_lead} in news coverage with {news_volume} articles analyzed",
+                confidence=confidence,
+                supporting_data=(
+                    f"Average sentiment score: {avg_sentiment:.3f}",
+                    f"News volume: {news_volume} articles",
+                    f"Top themes: {', '.join(sentiment_data.get('top_themes', [])[:3])}"
+                ),
+                impact=impact
+            )
+            trends.append(trend)
+        
+        # News volume trend
+        confidence = min(0.7, news_volume / 100)
+        if news_volume > 50 and confidence >= self.min_confidence_threshold:
+            trend = TrendData(
+                trend_name="High News Volume",
+                description=f"Significant media attention with {news_volume} articles in the timeframe",
+                confidence=confidence,
+                supporting_data=(
+                    f"Article count: {news_volume}",
+                    f"Sentiment trend: {sentiment}"
+                ),
+                impact="neutral"
+            )
+            trends.append(trend)
         
         return trends
     
-    def _analyze_economic_trends(self, market_data: List[MarketData]) -> List[TrendData]:
-        """Analyze economic indicator trends."""
+    def _analyze_economic_trends(self, economic_data: Dict[str, Any]) -> List[TrendData]:
+        """Analyze economic indicator trends from one economic data record."""
         trends = []
         
-        for data in market_data:
-            if data.source == "Economic Indicators":
-                economic_data = data.processed_data
-                
-                # Economic health trend
-                health = economic_data.get("economic_health", "unknown")
-                if health == "good":
-                    trend = TrendData(
-                        trend_name="Strong Economic Fundamentals",
-                        description="Economic indicators show positive fundamentals supporting market growth",
-                        confidence=0.8,
-                        supporting_data=[
-                            f"Economic health: {health}",
-                            f"Growth trend: {economic_data.get('growth_trend', 'unknown')}",
-                            f"Key risks: {', '.join(economic_data.get('key_risks', []))}"
-                        ],
-                        impact="positive"
-                    )
-                    trends.append(trend)
-                
-                elif health == "moderate":
-                    trend = TrendData(
-                        trend_name="Mixed Economic Signals",
-                        description="Economic indicators show mixed signals with moderate growth prospects",
-                        confidence=0.6,
-                        supporting_data=[
-                            f"Economic health: {health}",
-                            f"Growth trend: {economic_data.get('growth_trend', 'unknown')}",
-                            f"Market conditions: {economic_data.get('market_conditions', 'unknown')}"
-                        ],
-                        impact="neutral"
-                    )
-                    trends.append(trend)
-                
-                # Market conditions trend
-                conditions = economic_data.get("market_conditions", "unknown")
-                if conditions == "volatile":
-                    trend = TrendData(
-                        trend_name="Volatile Market Conditions",
-                        description="Economic indicators suggest increased market volatility",
-                        confidence=0.7,
-                        supporting_data=[
-                            f"Market conditions: {conditions}",
-                            f"Inflation pressure: {economic_data.get('inflation_pressure', 'unknown')}",
-                            f"Key risks: {', '.join(economic_data.get('key_risks', []))}"
-                        ],
-                        impact="negative"
-                    )
-                    trends.append(trend)
+        health = economic_data.get("economic_health", "unknown")
+        conditions = economic_data.get("market_conditions", "unknown")
+        key_risks = ', '.join(economic_data.get('key_risks', []))
+        
+        # Economic health trend
+        health_trend = _ECONOMIC_HEALTH_TRENDS.get(health)
+        if health_trend:
+            trend_name, description, confidence, impact, detail_template = health_trend
+            trend = TrendData(
+                trend_name=trend_name,
+                description=description,
+                confidence=confidence,
+                supporting_data=(
+                    f"Economic health: {health}",
+                    f"Growth trend: {economic_data.get('growth_trend', 'unknown')}",
+                    detail_template.format(key_risks=key_risks, conditions=conditions)
+                ),
+                impact=impact
+            )
+            trends.append(trend)
+        
+        # Market conditions trend
+        if conditions == "volatile":
+            trend = TrendData(
+                trend_name="Volatile Market Conditions",
+                description="Economic indicators suggest increased market volatility",
+                confidence=0.7,
+                supporting_data=(
+                    f"Market conditions: {conditions}",
+                    f"Inflation pressure: {economic_data.get('inflation_pressure', 'unknown')}",
+                    f"Key risks: {key_risks}"
+                ),
+                impact="negative"
+            )
+            trends.append(trend)
         
         return trends
     
-    def _analyze_sector_trends(self, market_data: List[MarketData], market: str) -> List[TrendData]:
+    def _analyze_sector_trends(self, sector_data: Optional[Dict[str, Any]], market: str) -> List[TrendData]:
         """Analyze sector-specific trends."""
         trends = []
         
-        # Look for sector-specific data
-        sector_data = None
-        for data in market_data:
-            if "sector" in data.processed_data:
-                sector_data = data.processed_data
-                break
-        
         if sector_data:
             sector = sector_data.get("sector", market.title())
             pe_ratio = sector_data.get("pe_ratio")
             
-            if pe_ratio:
-                try:
-                    pe_value = float(pe_ratio)
-                    if pe_value > 30:
-                        trend = TrendData(
-                            trend_name="High Valuation Sector",
-                            description=f"{sector} sector showing high valuations with P/E ratio of {pe_value}",
-                            confidence=0.7,
-                            supporting_data=[
-                                f"P/E ratio: {pe_value}",
-                                f"Sector: {sector}",
-                                f"Market cap: {sector_data.get('market_cap', 'N/A')}"
-                            ],
-                            impact="neutral"
-                        )
-                        trends.append(trend)
-                    
-                    elif pe_value < 15:
-                        trend = TrendData(
-                            trend_name="Undervalued Sector Opportunity",
-                            description=f"{sector} sector appears undervalued with P/E ratio of {pe_value}",
-                            confidence=0.6,
-                            supporting_data=[
-                                f"P/E ratio: {pe_value}",
-                                f"Sector: {sector}",
-                                f"Market cap: {sector_data.get('market_cap', 'N/A')}"
-                            ],
-                            impact="positive"
-                        )
-                        trends.append(trend)
-                
-                except (ValueError, TypeError):
-                    pass
+            pe_value = _parse_pe_ratio(pe_ratio) if pe_ratio else None
+            
+            if pe_value is not None and pe_value > 30:
+                trend = TrendData(
+                    trend_name="High Valuation Sector",
+                    description=f"{sector} sector showing high valuations with P/E ratio of {pe_value}",
+                    confidence=0.7,
+                    supporting_data=(
+                        f"P/E ratio: {pe_value}",
+                        f"Sector: {sector}",
+                        f"Market cap: {sector_data.get('market_cap', 'N/A')}"
+                    ),
+                    impact="neutral"
+                )
+                trends.append(trend)
+            
+            elif pe_value is not None and pe_value < 15:
+                trend = TrendData(
+                    trend_name="Undervalued Sector Opportunity",
+                    description=f"{sector} sector appears undervalued with P/E ratio of {pe_value}",
+                    confidence=0.6,
+                    supporting_data=(
+                        f"P/E ratio: {pe_value}",
+                        f"Sector: {sector}",
+                        f"Market cap: {sector_data.get('market_cap', 'N/A')}"
+                    ),
+                    impact="positive"
+                )
+                trends.append(trend)
         
         # Market-specific trend analysis
-        market_trend = self._get_market_specific_trend(market, market_data)
+        market_trend = self._get_market_specific_trend(market)
         if market_trend:
             trends.append(market_trend)
         
         return trends
     
-    def _get_market_specific_trend(self, market: str, market_data: List[MarketData]) -> TrendData:
+    def _get_market_specific_trend(self, market: str) -> TrendData:
         """Get market-specific trend based on the sector."""
         market_lower = market.lower()
         
-        # Technology sector trends
-        if "tech" in market_lower or "technology" in market_lower:
-            return TrendData(
-                trend_name="Technology Innovation Drive",
-                description="Technology sector continues to drive innovation with strong growth potential",
-                confidence=0.8,
-                supporting_data=[
-                    "High R&D investment",
-                    "Digital transformation acceleration",
-                    "AI and automation adoption"
-                ],
-                impact="positive"
-            )
-        
-        # Finance sector trends
-        elif "finance" in market_lower or "financial" in market_lower:
-            return TrendData(
-                trend_name="Financial Services Evolution",
-                description="Financial services sector adapting to digital transformation and regulatory changes",
-                confidence=0.7,
-                supporting_data=[
-                    "Fintech disruption",
-                    "Regulatory compliance focus",
-                    "Interest rate sensitivity"
-                ],
-                impact="neutral"
-            )
-        
-        # Healthcare sector trends
-        elif "health" in market_lower or "healthcare" in market_lower:
-            return TrendData(
-                trend_name="Healthcare Innovation Growth",
-                description="Healthcare sector benefiting from innovation and demographic trends",
-                confidence=0.8,
-                supporting_data=[
-                    "Aging population",
-                    "Medical technology advances",
-                    "Regulatory approval pipeline"
-                ],
-                impact="positive"
-            )
-        
-        # Energy sector trends
-        elif "energy" in market_lower:
-            return TrendData(
-                trend_name="Energy Transition Impact",
-                description="Energy sector navigating transition to renewable sources",
-                confidence=0.7,
-                supporting_data=[
-                    "Renewable energy growth",
-                    "Fossil fuel transition",
-                    "Geopolitical factors"
-                ],
-                impact="neutral"
-            )
+        # Known sector trends are shared instances (TrendData is frozen and its supporting data a tuple)
+        for keywords, trend in _SECTOR_TRENDS:
+            if any(keyword in market_lower for keyword in keywords):
+                return trend
         
         # Default trend for other sectors
-        else:
-            return TrendData(
-                trend_name="Sector-Specific Opportunities",
-                description=f"{market.title()} sector showing sector-specific growth opportunities",
-                confidence=0.6,
-                supporting_data=[
-                    "Market-specific factors",
-                    "Regional economic conditions",
-                    "Industry dynamics"
-                ],
-                impact="positive"
-            )
+        return TrendData(
+            trend_name="Sector-Specific Opportunities",
+            description=f"{market.title()} sector showing sector-specific growth opportunities",
+            confidence=0.6,
+            supporting_data=(
+                "Market-specific factors",
+                "Regional economic conditions",
+                "Industry dynamics"
+            ),
+            impact="positive"
+        )
     
     def _calculate_trend_confidence(self, supporting_data: List[str], data_quality: float = 1.0) -> float:
         """Calculate confidence score for a trend based on supporting data."""
@@ -346,3 +350,12 @@ class TrendAnalyzer:
             return "negative"
         else:
             return "neutral"
+
+
+def _parse_pe_ratio(pe_ratio: Any) -> Optional[float]:
+    """Parse a P/E ratio from a number or numeric string, or None if it is not numeric."""
+    if isinstance(pe_ratio, (int, float)):
+        return float(pe_ratio)
+    if isinstance(pe_ratio, str) and _NUMERIC_RE.fullmatch(pe_ratio):
+        return float(pe_ratio)
+    return None